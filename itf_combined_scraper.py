@@ -11,6 +11,10 @@ Visits each ITF match page ONCE and extracts:
 This replaces the standalone itf_home_away_auditor.py. No need for
 separate TB and time scrapers — everything lives on the same page.
 
+Pages are fetched concurrently over plain HTTP (aiohttp) and parsed with
+selectolax. Selenium is only used as a fallback for pages whose static
+HTML doesn't contain the match data (or that failed to fetch).
+
 Usage (4 parallel shards on server):
     python itf_combined_scraper.py --shard 0 --total-shards 4 --resume
     python itf_combined_scraper.py --shard 1 --total-shards 4 --resume
@@ -25,24 +29,37 @@ Apply results to the ITF CSV:
 """
 
 import os
-import re
+import csv
+import gzip
 import sys
 import time
 import signal
-import random
+import urllib.parse
+import asyncio
 import argparse
+import multiprocessing
+import aiohttp
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from multiprocessing.util import Finalize
+from selectolax.lexbor import LexborHTMLParser
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException, WebDriverException, NoSuchElementException, InvalidSessionIdException,
+)
 from webdriver_manager.chrome import ChromeDriverManager
 
+try:
+    import duckdb  # Optional: faster --combine
+except ImportError:
+    duckdb = None
+
 
 # ============================================
 # CONFIG
@@ -51,12 +68,45 @@ from webdriver_manager.chrome import ChromeDriverManager
 INPUT_FILE = "ITF_Flashscore_2019on_MatchRecord_FIXED_with_scores_and_sets.csv"
 OUTPUT_BASE = "itf_combined_scrape"
 
-DELAY_BETWEEN_MATCHES = (0.4, 0.8)
+REQUESTS_PER_SECOND = 8  # per host, before any backoff
 SAVE_EVERY = 50
 HEADLESS = True
 MAX_RETRIES = 3
-
-# Graceful shutdown
+DRIVER_RECYCLE_AFTER = 3  # consecutive failed loads before the driver is recreated
+
+# Requests Chrome never needs to make for a DOM-only scrape
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg',
+    '*.woff*', '*.ttf', '*.css', '*.mp4',
+    '*analytics*', '*doubleclick*', '*googletagmanager*',
+]
+
+# Input columns the scrape itself needs (the rest only matter for --apply)
+SCRAPE_INPUT_COLS = ['match_uid', 'match_url', 'player_home', 'player_away',
+                     'player_home_id', 'player_away_id']
+
+# Columns --apply fills; with --skip-complete, rows that already have them
+# all are not scraped (TB/set times only count for sets that need them)
+SET_SCORE_COLS = [f'{side}_set{n}' for n in (1, 2, 3) for side in ('home', 'away')]
+FILL_TARGET_COLS = (
+    [f'{side}_set{n}_tb' for n in (1, 2, 3) for side in ('home', 'away')]
+    + ['time_overall', 'time_set1', 'time_set2', 'time_set3', 'list_date_time', 'court_type']
+)
+
+# Parsed-OK match pages are kept gzipped here with --cache
+CACHE_DIR = "html_cache"
+CACHE_TTL_DAYS = 30
+
+# HTTP fetch path
+HTTP_CONCURRENCY = 32
+HTTP_TIMEOUT = 10
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Graceful shutdown (handlers installed in main; pool workers ignore
+# SIGINT, see init_worker)
 SHUTDOWN_REQUESTED = False
 
 def signal_handler(sig, frame):
@@ -64,21 +114,120 @@ def signal_handler(sig, frame):
     print("\n[SIGNAL] Shutdown requested. Finishing current match...")
     SHUTDOWN_REQUESTED = True
 
-signal.signal(signal.SIGINT, signal_handler)
-if hasattr(signal, 'SIGTERM'):
-    signal.signal(signal.SIGTERM, signal_handler)
-
 
 def log(msg):
     ts = datetime.now().strftime('%H:%M:%S')
     print(f"[{ts}] {msg}")
 
 
+# ============================================
+# RATE LIMITING
+# ============================================
+
+class HostLimiter:
+    """
+    Paces requests to one host: at most `rps` request starts per second,
+    plus a backoff that grows on 429/5xx/timeouts and decays on success.
+
+    The schedule lives in shared memory, so --workers pool processes that
+    inherit the parent's limiter (see init_worker) draw from the same one.
+    """
+
+    def __init__(self, rps):
+        self.min_interval = 1.0 / rps
+        self.state = multiprocessing.Array('d', 2)  # [last slot, backoff], with its own lock
+
+    def reserve(self):
+        """Claim the next request slot; returns how long to sleep until it."""
+        with self.state.get_lock():
+            now = time.monotonic()
+            last, backoff = self.state
+            slot = max(now, last + self.min_interval + backoff)
+            self.state[0] = slot
+        return slot - now
+
+    def wait(self):
+        time.sleep(self.reserve())
+
+    async def wait_async(self):
+        await asyncio.sleep(self.reserve())
+
+    def penalize(self):
+        with self.state.get_lock():
+            self.state[1] = min(self.state[1] * 2 + 0.5, 30)
+
+    def relax(self):
+        with self.state.get_lock():
+            self.state[1] = max(0.0, self.state[1] * 0.5)
+
+
+LIMITERS = {}
+
+
+def limiter_for(url):
+    """The HostLimiter for url's host (shared with pool workers created after it)."""
+    host = urllib.parse.urlsplit(url).netloc
+    if host not in LIMITERS:
+        LIMITERS[host] = HostLimiter(REQUESTS_PER_SECOND)
+    return LIMITERS[host]
+
+
+# ============================================
+# HTML CACHE
+# ============================================
+
+def cache_path(match_uid):
+    return os.path.join(CACHE_DIR, match_uid[:2], f"{match_uid}.html.gz")
+
+
+def load_cached_html(match_uid):
+    """Cached page HTML for match_uid, or None if missing, stale or unreadable."""
+    path = cache_path(match_uid)
+    try:
+        if time.time() - os.path.getmtime(path) > CACHE_TTL_DAYS * 86400:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+    except (OSError, EOFError):
+        return None
+
+
+def save_cached_html(match_uid, html):
+    """
+    Write via a temp file so a killed run never leaves a truncated entry.
+    A failed write (disk full, permissions) only costs the cache entry.
+    """
+    path = cache_path(match_uid)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(gzip.compress(html.encode('utf-8'), compresslevel=6))
+        os.replace(tmp, path)
+    except OSError as e:
+        log(f"  WARNING: couldn't cache {match_uid} ({e!r})")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
 # ============================================
 # SELENIUM SETUP
 # ============================================
 
 COOKIE_ACCEPTED = False
+CONSECUTIVE_FAILURES = 0
+_DRIVER_PATH = None
+
+
+def driver_path():
+    """Resolve chromedriver once per process (webdriver-manager does I/O on every install())."""
+    global _DRIVER_PATH
+    if _DRIVER_PATH is None:
+        _DRIVER_PATH = ChromeDriverManager().install()
+    return _DRIVER_PATH
+
 
 def create_driver():
     options = webdriver.ChromeOptions()
@@ -89,13 +238,24 @@ def create_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
     options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-    service = Service(ChromeDriverManager().install())
+    options.add_argument(f"user-agent={USER_AGENT}")
+    # We only read the DOM — don't download or render anything else, and
+    # return from driver.get() at DOMContentLoaded
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+    })
+    options.page_load_strategy = 'eager'
+    service = Service(driver_path())
     driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
     driver.set_page_load_timeout(30)
+    # No implicit wait: a non-zero value makes every lookup for an element
+    # that legitimately isn't there (no Set 3, no TB <sup>) block for the
+    # full timeout. scrape_match_page waits explicitly, once, instead.
+    driver.implicitly_wait(0)
     return driver
 
 
@@ -115,54 +275,77 @@ def accept_cookies(driver):
             COOKIE_ACCEPTED = True
             log("Cookie consent accepted")
             return
-        except:
+        except (TimeoutException, WebDriverException, NoSuchElementException):
             continue
     COOKIE_ACCEPTED = True  # Don't retry
 
 
+def is_session_lost(e):
+    if isinstance(e, InvalidSessionIdException):
+        return True
+    return isinstance(e, WebDriverException) and 'session' in str(e).lower()
+
+
 def safe_get(driver, url, retries=MAX_RETRIES):
-    """Load URL with retries, recreating driver on failure."""
-    global COOKIE_ACCEPTED
+    """
+    Load URL with retries on the same driver.
+
+    The driver is only recreated when its session is gone, or after
+    DRIVER_RECYCLE_AFTER consecutive failed loads.
+    """
+    global COOKIE_ACCEPTED, CONSECUTIVE_FAILURES
+    limiter = limiter_for(url)
     for attempt in range(retries):
         try:
+            limiter.wait()
             driver.get(url)
-            time.sleep(1.5 + random.uniform(0, 0.5))
             accept_cookies(driver)
+            CONSECUTIVE_FAILURES = 0
+            limiter.relax()
             return driver
         except Exception as e:
+            CONSECUTIVE_FAILURES += 1
+            limiter.penalize()
             log(f"  safe_get attempt {attempt+1}/{retries} failed: {e}")
             if attempt < retries - 1:
-                try:
-                    driver.quit()
-                except:
-                    pass
-                driver = create_driver()
+                if is_session_lost(e) or CONSECUTIVE_FAILURES >= DRIVER_RECYCLE_AFTER:
+                    try:
+                        driver.quit()
+                    except Exception:  # Dead chromedriver surfaces as urllib3 errors too
+                        pass
+                    driver = create_driver()
+                    CONSECUTIVE_FAILURES = 0
+                else:
+                    try:
+                        driver.delete_all_cookies()
+                    except WebDriverException:
+                        pass
                 COOKIE_ACCEPTED = False
                 time.sleep(2)
     return driver
 
 
 def extract_id_from_href(href):
-    """Extract player ID from href like /player/name/ID/"""
+    """Extract player ID from href like /player/name/ID/ (relative or absolute)"""
     if not href:
         return None
-    match = re.search(r'/player/[^/]+/([A-Za-z0-9]+)/?', href)
-    return match.group(1) if match else None
+    parts = [p for p in href.split('/') if p]
+    try:
+        i = parts.index('player')
+    except ValueError:
+        return None
+    if len(parts) > i + 2 and parts[i + 2].isalnum():
+        return parts[i + 2]
+    return None
 
 
 # ============================================
 # SCRAPING — ALL DATA FROM ONE PAGE
 # ============================================
 
-def scrape_match_page(driver, url):
-    """
-    Visit one match page and extract everything:
-      - Home/away player names + IDs
-      - Tiebreak scores (from <sup> in score box)
-      - Match time + set times
-      - Date/time
-    """
-    result = {
+def empty_result():
+    """Blank result dict — every field the shard CSV expects from a page."""
+    return {
         # Home/Away
         'page_home_name': None,
         'page_home_id': None,
@@ -192,137 +375,288 @@ def scrape_match_page(driver, url):
         'error': None,
     }
 
+
+# Shard CSV columns, in order
+RESULT_FIELDS = [
+    'match_uid', 'ha_status', 'ha_method',
+    'csv_home_name', 'csv_home_id', 'csv_away_name', 'csv_away_id',
+    *empty_result(),
+]
+
+
+def court_type_from_texts(overline_texts, info_texts):
+    """
+    Build the court type from the overline header + infoBox texts.
+
+    Surface from overline header: "Tournament, SURFACE - Round"
+    Some tournaments have commas in name (e.g. "Raleigh, NC, HARD - QF")
+    so we take the LAST comma-segment before " - "
+    """
+    surface = None
+    for text in overline_texts:
+        if ',' in text and ' - ' in text:
+            before_dash = text.split(' - ', 1)[0].strip()
+            surface = before_dash.rsplit(',', 1)[-1].strip().upper()
+            break
+
+    if not surface:
+        return None
+
+    # Indoor detection from infoBox
+    played_indoor = any('played indoor' in text.lower() for text in info_texts)
+
+    # Format: outdoor = "HARD", indoor = "HARD (indoor)"
+    if played_indoor:
+        # Title-case for readability: "Hard (indoor)", "Clay (indoor)"
+        return f"{surface.title()} (indoor)"
+    return surface
+
+
+# Score cell classes -> side / set number (Sets 1–3)
+SCORE_SIDE_CLASSES = {'smh__home': 'home', 'smh__away': 'away'}
+SCORE_SET_CLASSES = {f'smh__part--{n}': n for n in range(1, 4)}
+# (set, side) -> (set score field, TB score field)
+SCORE_FIELDS = {(n, side): (f'page_set{n}_{side}', f'page_set{n}_tb_{side}')
+                for n in range(1, 4) for side in ('home', 'away')}
+# Per-set times (0-indexed: --0 = Set 1, --1 = Set 2, --2 = Set 3)
+SET_TIME_SELECTORS = [(f'page_time_set{i+1}', f'div.smh__time.smh__time--{i}') for i in range(3)]
+
+
+def node_text(node):
+    return node.text().strip() if node is not None else ''
+
+
+def parse_match_html(html):
+    """
+    Extract every result field from a match page's HTML.
+
+    Returns None if the participant block isn't in the HTML (static
+    page still needs JS) so the caller can fall back to Selenium.
+    """
+    tree = LexborHTMLParser(html)
+    home_div = tree.css_first('div.duelParticipant__home')
+    away_div = tree.css_first('div.duelParticipant__away')
+    if home_div is None or away_div is None:
+        return None
+
+    result = empty_result()
+
+    # ---- HOME / AWAY PLAYERS ----
+    for side, div in [('home', home_div), ('away', away_div)]:
+        name_el = div.css_first('a.participant__participantName, div.participant__participantName')
+        if name_el is None:
+            result['error'] = f"{side.title()} player extraction failed: no participant name"
+            return result
+        result[f'page_{side}_name'] = node_text(name_el)
+        link = div.css_first('a.participant__participantLink')
+        if link is not None:
+            result[f'page_{side}_id'] = extract_id_from_href(link.attributes.get('href'))
+
+    # ---- SCORE BOX: Set scores + Tiebreak scores ----
+    # One pass over every score cell; side + set come from the cell's
+    # classes ("smh__part smh__home smh__part--1"). Missing sets
+    # (e.g. no Set 3) simply have no cell.
+    seen = set()
+    for el in tree.css('div.smh__part'):
+        classes = (el.attributes.get('class') or '').split()
+        side = next((SCORE_SIDE_CLASSES[c] for c in classes if c in SCORE_SIDE_CLASSES), None)
+        set_num = next((SCORE_SET_CLASSES[c] for c in classes if c in SCORE_SET_CLASSES), None)
+        if side is None or set_num is None or (set_num, side) in seen:
+            continue
+        seen.add((set_num, side))
+        score_field, tb_field = SCORE_FIELDS[(set_num, side)]
+
+        tb_score = node_text(el.css_first('sup')) or None
+        if tb_score:
+            result[tb_field] = tb_score
+
+        # Set score is the cell's own text node; the TB score sits in <sup>
+        score_text = el.text(deep=False).strip()
+        if score_text:
+            result[score_field] = score_text
+
+    # ---- TIMES ----
+    time_el = tree.css_first('div.smh__time.smh__time--overall')
+    if time_el is not None:
+        result['page_time_overall'] = node_text(time_el)
+
+    for field, sel in SET_TIME_SELECTORS:
+        text = node_text(tree.css_first(sel))
+        if text:
+            result[field] = text
+
+    # ---- DATE/TIME ----
+    dt_el = tree.css_first('div.duelParticipant__startTime div')
+    if dt_el is not None:
+        result['page_date_time'] = node_text(dt_el)
+
+    # ---- SURFACE + INDOOR/OUTDOOR ----
+    result['page_court_type'] = court_type_from_texts(
+        [node_text(span) for span in tree.css('span[data-testid="wcl-scores-overline-03"]')],
+        [node_text(box) for box in tree.css('div.infoBox__info')],
+    )
+
+    return result
+
+
+# Pull the rendered DOM back in one WebDriver call instead of ~25
+# find_element/.text/get_attribute round-trips, then parse it locally
+PAGE_HTML_JS = "return document.documentElement.outerHTML;"
+
+
+def scrape_match_page(driver, url, match_uid=None):
+    """
+    Visit one match page and extract everything:
+      - Home/away player names + IDs
+      - Tiebreak scores (from <sup> in score box)
+      - Match time + set times
+      - Date/time
+
+    Selenium fallback for pages the HTTP path couldn't handle. The live
+    DOM goes through the same parse_match_html as the HTTP path. Pages
+    that parse are cached under match_uid, if given.
+    """
     try:
         driver = safe_get(driver, url)
 
-        # ---- HOME PLAYER ----
+        # Wait once for the participant block before reading the DOM
         try:
-            home_div = driver.find_element(By.CSS_SELECTOR, 'div.duelParticipant__home')
-            home_name_el = home_div.find_element(By.CSS_SELECTOR,
-                'a.participant__participantName, div.participant__participantName')
-            result['page_home_name'] = home_name_el.text.strip()
-            try:
-                home_link = home_div.find_element(By.CSS_SELECTOR, 'a.participant__participantLink')
-                result['page_home_id'] = extract_id_from_href(home_link.get_attribute('href'))
-            except NoSuchElementException:
-                pass
-        except Exception as e:
-            result['error'] = f"Home player extraction failed: {e}"
-            return result, driver
+            WebDriverWait(driver, 8).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'div.duelParticipant__home')))
+        except TimeoutException:
+            pass  # Reported below as a failed home player extraction
 
-        # ---- AWAY PLAYER ----
+        # The score box and times render after the header; eager page loads
+        # return before them. Walkovers have neither, so a timeout is fine.
         try:
-            away_div = driver.find_element(By.CSS_SELECTOR, 'div.duelParticipant__away')
-            away_name_el = away_div.find_element(By.CSS_SELECTOR,
-                'a.participant__participantName, div.participant__participantName')
-            result['page_away_name'] = away_name_el.text.strip()
-            try:
-                away_link = away_div.find_element(By.CSS_SELECTOR, 'a.participant__participantLink')
-                result['page_away_id'] = extract_id_from_href(away_link.get_attribute('href'))
-            except NoSuchElementException:
-                pass
-        except Exception as e:
-            result['error'] = f"Away player extraction failed: {e}"
-            return result, driver
-
-        # ---- SCORE BOX: Set scores + Tiebreak scores ----
-        for set_num in range(1, 4):  # Sets 1–3
-            for side, label in [('home', 'home'), ('away', 'away')]:
-                try:
-                    el = driver.find_element(By.CSS_SELECTOR,
-                        f'div.smh__part.smh__{side}.smh__part--{set_num}')
-
-                    # Get TB score from <sup> first
-                    tb_score = None
-                    try:
-                        sup_el = el.find_element(By.CSS_SELECTOR, 'sup')
-                        sup_text = sup_el.text.strip()
-                        if sup_text:
-                            tb_score = sup_text
-                            result[f'page_set{set_num}_tb_{label}'] = tb_score
-                    except NoSuchElementException:
-                        pass
+            WebDriverWait(driver, 3).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, 'div.smh__part, div.smh__time--overall')))
+        except TimeoutException:
+            pass
 
-                    # Get set score (text node only, excluding <sup>)
-                    full_text = el.text.strip()
-                    if tb_score and full_text.endswith(tb_score):
-                        score_text = full_text[:-len(tb_score)].strip()
-                    elif tb_score:
-                        score_text = full_text.replace(tb_score, "").strip()
-                    else:
-                        score_text = full_text
+        html = driver.execute_script(PAGE_HTML_JS)
+    except Exception as e:
+        result = empty_result()
+        result['error'] = str(e)
+        return result, driver
+
+    result = parse_match_html(html or '')
+    if result is None:
+        result = empty_result()
+        result['error'] = "Home player extraction failed: div.duelParticipant__home not found"
+    elif match_uid:
+        save_cached_html(match_uid, html)
+    return result, driver
 
-                    if score_text:
-                        result[f'page_set{set_num}_{label}'] = score_text
 
-                except NoSuchElementException:
-                    pass  # Set doesn't exist (e.g. no Set 3)
+# ============================================
+# SELENIUM WORKER POOL (--workers > 1)
+# ============================================
 
-        # ---- TIMES ----
-        # Overall match time
-        try:
-            time_el = driver.find_element(By.CSS_SELECTOR, 'div.smh__time.smh__time--overall')
-            result['page_time_overall'] = time_el.text.strip()
-        except NoSuchElementException:
-            pass
+DRIVER = None  # Each pool worker owns one persistent driver
 
-        # Per-set times (0-indexed: --0 = Set 1, --1 = Set 2, --2 = Set 3)
-        for i in range(3):
-            try:
-                time_el = driver.find_element(By.CSS_SELECTOR, f'div.smh__time.smh__time--{i}')
-                text = time_el.text.strip()
-                if text:
-                    result[f'page_time_set{i+1}'] = text
-            except NoSuchElementException:
-                pass
 
-        # ---- DATE/TIME ----
+def worker_sigterm(sig, frame):
+    """pool.terminate() kills workers with SIGTERM: quit Chrome before exiting."""
+    if DRIVER is not None:
         try:
-            dt_el = driver.find_element(By.CSS_SELECTOR, 'div.duelParticipant__startTime div')
-            result['page_date_time'] = dt_el.text.strip()
-        except NoSuchElementException:
+            DRIVER.quit()
+        except Exception:  # Dead chromedriver surfaces as urllib3 errors too
             pass
+    os._exit(0)
 
-        # ---- SURFACE + INDOOR/OUTDOOR ----
-        # Surface from overline header: "Tournament, SURFACE - Round"
-        # Some tournaments have commas in name (e.g. "Raleigh, NC, HARD - QF")
-        # so we take the LAST comma-segment before " - "
-        surface = None
-        try:
-            spans = driver.find_elements(By.CSS_SELECTOR, 'span[data-testid="wcl-scores-overline-03"]')
-            for span in spans:
-                text = span.text.strip()
-                if ',' in text and ' - ' in text:
-                    before_dash = text.split(' - ', 1)[0].strip()
-                    surface = before_dash.rsplit(',', 1)[-1].strip().upper()
-                    break
-        except:
-            pass
 
-        # Indoor detection from infoBox
-        played_indoor = False
+def init_worker(limiters):
+    """
+    Pool initializer: leave shutdown to the parent, pace page loads with the
+    parent's host limiters, start this worker's driver.
+    """
+    global DRIVER
+    LIMITERS.update(limiters)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, worker_sigterm)
+    # An initializer that raises makes the pool respawn the worker forever,
+    # so a failed start is left to scrape_in_worker to report per task
+    try:
+        DRIVER = create_driver()
+    except Exception as e:
+        log(f"  Worker {os.getpid()} couldn't start Chrome: {e!r}")
+    Finalize(None, lambda: DRIVER is not None and DRIVER.quit(), exitpriority=10)
+
+
+def scrape_in_worker(task):
+    """Scrape one (position, url, cache uid) task on this worker's driver."""
+    global DRIVER
+    pos, url, match_uid = task
+    if DRIVER is None:
         try:
-            info_boxes = driver.find_elements(By.CSS_SELECTOR, 'div.infoBox__info')
-            for box in info_boxes:
-                box_text = (box.text or '').strip().lower()
-                if 'played indoor' in box_text:
-                    played_indoor = True
-                    break
-        except:
-            pass
+            DRIVER = create_driver()
+        except Exception as e:
+            info = empty_result()
+            info['error'] = f"Couldn't start Chrome: {e!r}"
+            return pos, info
+    info, DRIVER = scrape_match_page(DRIVER, url, match_uid)
+    return pos, info
 
-        # Format: outdoor = "HARD", indoor = "HARD (indoor)"
-        if surface:
-            if played_indoor:
-                # Title-case for readability: "Hard (indoor)", "Clay (indoor)"
-                result['page_court_type'] = f"{surface.title()} (indoor)"
-            else:
-                result['page_court_type'] = surface
 
-    except Exception as e:
-        result['error'] = str(e)
+# ============================================
+# HTTP FETCH (primary path)
+# ============================================
 
-    return result, driver
+def create_session():
+    """HTTP session for the whole shard. Must be called inside a running event loop."""
+    connector = aiohttp.TCPConnector(limit=128, limit_per_host=8, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT})
+
+
+async def open_session():
+    return create_session()
+
+
+async def fetch_match(session, url, match_uid=None):
+    """
+    Fetch + parse one match page. Returns None if Selenium is needed.
+    With a match_uid, the HTML cache is checked first and filled on success.
+    """
+    if match_uid:
+        html = load_cached_html(match_uid)
+        if html is not None:
+            info = parse_match_html(html)
+            if info is not None:
+                return info
+
+    limiter = limiter_for(url)
+    await limiter.wait_async()
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
+            resp.raise_for_status()
+            html = await resp.text()
+    except UnicodeDecodeError as e:
+        log(f"  Undecodable page, falling back to Selenium: {url} ({e!r})")
+        return None
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Back off when the server pushes back, not on e.g. a 404
+        status = getattr(e, 'status', None)
+        if status is None or status == 429 or status >= 500:
+            limiter.penalize()
+        log(f"  HTTP fetch failed, falling back to Selenium: {url} ({e!r})")
+        return None
+    limiter.relax()
+    info = parse_match_html(html)
+    if info is not None and match_uid:
+        save_cached_html(match_uid, html)
+    return info
+
+
+async def fetch_matches(session, urls, match_uids):
+    """Fetch a batch of match pages concurrently, results in input order."""
+    sem = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+    async def bounded(url, match_uid):
+        async with sem:
+            return await fetch_match(session, url, match_uid)
+
+    return await asyncio.gather(*(bounded(url, uid) for url, uid in zip(urls, match_uids)))
 
 
 # ============================================
@@ -372,17 +706,25 @@ def combine_shards(output_base):
         return
 
     log(f"Found {len(shard_files)} shard files:")
-    dfs = []
-    for f in shard_files:
-        df = pd.read_csv(f)
-        log(f"  {f}: {len(df)} rows")
-        dfs.append(df)
+    out_file = f"{output_base}_combined.csv"
 
-    combined = pd.concat(dfs, ignore_index=True)
-    combined = combined.drop_duplicates(subset='match_uid', keep='last')
+    if duckdb is not None:
+        combine_with_duckdb(shard_files, out_file)
+    else:
+        dfs = []
+        for f in shard_files:
+            # Every column as text, blanks kept blank: the combined file gets
+            # the shard's own values ("6", not "6.0"), as with DuckDB
+            df = pd.read_csv(f, dtype=str, keep_default_na=False)
+            log(f"  {f}: {len(df)} rows")
+            dfs.append(df)
 
-    out_file = f"{output_base}_combined.csv"
-    combined.to_csv(out_file, index=False)
+        combined = pd.concat(dfs, ignore_index=True)
+        combined = combined.drop_duplicates(subset='match_uid', keep='last')
+        combined.to_csv(out_file, index=False)
+
+    # Summary counts want blanks as NaN, so both paths read the result back
+    combined = pd.read_csv(out_file, low_memory=False)
 
     # Summary
     total = len(combined)
@@ -413,6 +755,35 @@ def combine_shards(output_base):
             log(f"    {srf}: {cnt:,}")
 
 
+def combine_with_duckdb(shard_files, out_file):
+    """
+    Concat + dedupe the shard CSVs in DuckDB and write out_file.
+
+    Same result as the pandas path: every column kept as text, and for a
+    repeated match_uid the last row (in shard-file order) wins and stays
+    in that row's position.
+    """
+    files = ", ".join("'" + f.replace("'", "''") + "'" for f in shard_files)
+    con = duckdb.connect()
+    con.execute(f"""
+        CREATE TEMP TABLE shards AS
+        SELECT *, row_number() OVER () AS _row
+        FROM read_csv([{files}], header=true, union_by_name=true, filename=true, all_varchar=true)
+    """)
+    for f, n in con.execute("SELECT filename, count(*) FROM shards GROUP BY filename ORDER BY filename").fetchall():
+        log(f"  {f}: {n} rows")
+
+    out_sql = out_file.replace("'", "''")
+    con.execute(f"""
+        COPY (
+            SELECT * EXCLUDE (filename, _row) FROM shards
+            QUALIFY row_number() OVER (PARTITION BY match_uid ORDER BY _row DESC) = 1
+            ORDER BY _row
+        ) TO '{out_sql}' (HEADER, DELIMITER ',')
+    """)
+    con.close()
+
+
 # ============================================
 # APPLY MODE — Update the ITF CSV with scraped data
 # ============================================
@@ -425,79 +796,91 @@ def apply_results(input_file, output_base):
         sys.exit(1)
 
     log(f"Loading {input_file}...")
-    df = pd.read_csv(input_file, low_memory=False)
-    scrape = pd.read_csv(combined_file)
+    # NumPy-backed dtypes: the fills below write page strings into columns
+    # that may be all-null (or float) in the CSV, which Arrow types reject
+    df = pd.read_csv(input_file, engine='pyarrow')
+    scrape = pd.read_csv(combined_file, engine='pyarrow')
     log(f"  ITF: {len(df):,} rows | Scraped: {len(scrape):,} rows")
 
-    # Index by match_uid for fast lookup
-    scrape = scrape.set_index('match_uid')
-    changes = {'tb_filled': 0, 'time_filled': 0, 'ha_swapped': 0, 'datetime_filled': 0}
+    # Row position of each ITF match in the scrape; page columns are pulled
+    # out as NumPy arrays aligned to df's rows instead of merging frames
+    scrape = scrape.drop_duplicates(subset='match_uid', keep='last').set_index('match_uid')
+    pos = scrape.index.get_indexer(df['match_uid'])
+    scraped = pos >= 0
+    if not scraped.any():
+        # Also guards page_values, which indexes into the scrape's rows
+        log(f"  No scraped rows match {input_file} — nothing to apply, input left as is")
+        return
+    df_cols = set(df.columns)
+    scrape_cols = set(scrape.columns)
+    changes = {'tb_filled': 0, 'time_filled': 0, 'ha_swapped': 0, 'datetime_filled': 0, 'surface_filled': 0}
+
+    def page_values(page_col):
+        """page_col for every df row (NaN where the match wasn't scraped)."""
+        vals = scrape[page_col].to_numpy()[pos]
+        return pd.Series(np.where(scraped, vals, np.nan), index=df.index)
+
+    # ---- Home/Away swap ----
+    # Runs before the fills so page values land on the page's home/away side
+    swap = page_values('ha_status').eq('swapped')
+    if swap.any():
+        # Player names/IDs plus all home_* <-> away_* stat columns
+        pairs = [('player_home', 'player_away'), ('player_home_id', 'player_away_id')]
+        for hc in [c for c in df.columns if c.startswith('home_')]:
+            ac = hc.replace('home_', 'away_', 1)
+            if ac in df_cols:
+                pairs.append((hc, ac))
+        home_cols = [hc for hc, _ in pairs]
+        away_cols = [ac for _, ac in pairs]
+        df.loc[swap, home_cols + away_cols] = df.loc[swap, away_cols + home_cols].to_numpy()
+
+        # Swap match_score (e.g., "2-0" → "0-2")
+        ms_mask = swap & df['match_score'].astype(str).str.contains('-', regex=False)
+        df.loc[ms_mask, 'match_score'] = (
+            df.loc[ms_mask, 'match_score'].str.split('-').str[::-1].str.join('-'))
+
+        # Swap time columns (not side-specific, no swap needed)
+        changes['ha_swapped'] = int(swap.sum())
+
+    def fill(csv_col, page_col, blank_is_missing=True):
+        """Fill csv_col from page_col wherever the CSV value is missing. Returns cells filled."""
+        current = df[csv_col]
+        page = page_values(page_col)
+        missing = current.isna()
+        if blank_is_missing:
+            missing |= current.astype(str).str.strip() == ''
+        mask = missing & page.notna()
+        df[csv_col] = current.where(~mask, page)
+        return int(mask.sum())
+
+    # ---- Fill TB scores ----
+    for set_n in [1, 2, 3]:
+        for side in ['home', 'away']:
+            tb_col = f'{side}_set{set_n}_tb'
+            page_col = f'page_set{set_n}_tb_{side}'
+            if tb_col in df_cols and page_col in scrape_cols:
+                changes['tb_filled'] += fill(tb_col, page_col, blank_is_missing=False)
+
+    # ---- Fill times ----
+    time_map = {
+        'time_overall': 'page_time_overall',
+        'time_set1': 'page_time_set1',
+        'time_set2': 'page_time_set2',
+        'time_set3': 'page_time_set3',
+    }
+    for csv_col, page_col in time_map.items():
+        if csv_col in df_cols and page_col in scrape_cols:
+            changes['time_filled'] += fill(csv_col, page_col)
+
+    # ---- Fill date/time ----
+    if 'page_date_time' in scrape_cols:
+        changes['datetime_filled'] = fill('list_date_time', 'page_date_time')
 
-    for idx, row in df.iterrows():
-        uid = row['match_uid']
-        if uid not in scrape.index:
-            continue
-        s = scrape.loc[uid]
-
-        # ---- Fill TB scores ----
-        for set_n in [1, 2, 3]:
-            for side in ['home', 'away']:
-                tb_col = f'{side}_set{set_n}_tb'
-                page_col = f'page_set{set_n}_tb_{side}'
-                if tb_col in df.columns and page_col in scrape.columns:
-                    page_val = s.get(page_col)
-                    if pd.notna(page_val) and pd.isna(row.get(tb_col)):
-                        df.at[idx, tb_col] = page_val
-                        changes['tb_filled'] += 1
-
-        # ---- Fill times ----
-        time_map = {
-            'time_overall': 'page_time_overall',
-            'time_set1': 'page_time_set1',
-            'time_set2': 'page_time_set2',
-            'time_set3': 'page_time_set3',
-        }
-        for csv_col, page_col in time_map.items():
-            if csv_col in df.columns and page_col in scrape.columns:
-                page_val = s.get(page_col)
-                if pd.notna(page_val) and (pd.isna(row.get(csv_col)) or str(row.get(csv_col)).strip() == ''):
-                    df.at[idx, csv_col] = page_val
-                    changes['time_filled'] += 1
-
-        # ---- Fill date/time ----
-        if pd.notna(s.get('page_date_time')) and (pd.isna(row.get('list_date_time')) or str(row.get('list_date_time')).strip() == ''):
-            df.at[idx, 'list_date_time'] = s['page_date_time']
-            changes['datetime_filled'] += 1
-
-        # ---- Fill surface ----
-        if 'page_court_type' in scrape.columns and pd.notna(s.get('page_court_type')):
-            if 'court_type' not in df.columns:
-                df['court_type'] = np.nan
-            if pd.isna(row.get('court_type')) or str(row.get('court_type')).strip() == '':
-                df.at[idx, 'court_type'] = s['page_court_type']
-                changes['surface_filled'] = changes.get('surface_filled', 0) + 1
-
-        # ---- Home/Away swap ----
-        if s.get('ha_status') == 'swapped':
-            # Swap player names
-            df.at[idx, 'player_home'], df.at[idx, 'player_away'] = row['player_away'], row['player_home']
-            df.at[idx, 'player_home_id'], df.at[idx, 'player_away_id'] = row['player_away_id'], row['player_home_id']
-
-            # Swap all home_* <-> away_* stat columns
-            home_cols = [c for c in df.columns if c.startswith('home_')]
-            for hc in home_cols:
-                ac = hc.replace('home_', 'away_', 1)
-                if ac in df.columns:
-                    df.at[idx, hc], df.at[idx, ac] = row[ac], row[hc]
-
-            # Swap match_score (e.g., "2-0" → "0-2")
-            ms = str(row.get('match_score', ''))
-            if '-' in ms:
-                parts = ms.split('-')
-                df.at[idx, 'match_score'] = f"{parts[1]}-{parts[0]}"
-
-            # Swap time columns (not side-specific, no swap needed)
-            changes['ha_swapped'] += 1
+    # ---- Fill surface ----
+    if 'page_court_type' in scrape_cols and page_values('page_court_type').notna().any():
+        if 'court_type' not in df_cols:
+            df['court_type'] = None
+        changes['surface_filled'] = fill('court_type', 'page_court_type')
 
     log(f"\n{'='*60}")
     log(f"  APPLY SUMMARY")
@@ -505,7 +888,7 @@ def apply_results(input_file, output_base):
     log(f"  TB scores filled:      {changes['tb_filled']:,}")
     log(f"  Time values filled:    {changes['time_filled']:,}")
     log(f"  Date/time filled:      {changes['datetime_filled']:,}")
-    log(f"  Surface filled:        {changes.get('surface_filled', 0):,}")
+    log(f"  Surface filled:        {changes['surface_filled']:,}")
     log(f"  Home/away swapped:     {changes['ha_swapped']:,}")
 
     # Backup and save
@@ -530,10 +913,21 @@ def main():
     parser.add_argument("--total-shards", type=int, default=1, help="Total number of shards")
     parser.add_argument("--resume", action="store_true", help="Skip already-scraped matches")
     parser.add_argument("--limit", type=int, default=0, help="Max matches to process (0=unlimited)")
+    parser.add_argument("--skip-complete", action="store_true",
+                        help="Don't scrape matches whose TB/time/date/surface are already filled "
+                             "(they also skip the home/away check)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Selenium fallback processes, one driver each (default 1 = in-process)")
+    parser.add_argument("--cache", action="store_true",
+                        help=f"Read and write the ./{CACHE_DIR} page cache")
     parser.add_argument("--combine", action="store_true", help="Combine shard outputs")
     parser.add_argument("--apply", action="store_true", help="Apply scraped data to ITF CSV")
     args = parser.parse_args()
 
+    signal.signal(signal.SIGINT, signal_handler)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, signal_handler)
+
     if args.combine:
         combine_shards(args.output_base)
         return
@@ -555,7 +949,14 @@ def main():
         log(f"ERROR: Input file not found: {args.input}")
         sys.exit(1)
 
-    df = pd.read_csv(args.input, low_memory=False)
+    usecols = SCRAPE_INPUT_COLS
+    if args.skip_complete:
+        header = set(pd.read_csv(args.input, nrows=0).columns)
+        usecols = usecols + [c for c in SET_SCORE_COLS + FILL_TARGET_COLS if c in header]
+
+    # Everything read as text: IDs are compared against page hrefs verbatim
+    df = pd.read_csv(args.input, engine='pyarrow', usecols=usecols,
+                     dtype='string', dtype_backend='pyarrow').fillna('')
     log(f"Loaded {len(df):,} matches")
 
     # Shard
@@ -563,26 +964,53 @@ def main():
     log(f"This shard: {len(df):,} matches")
 
     # Resume
+    write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    keep_sidecar = write_header or sidecar_is_current(output_file)
     existing_uids = set()
-    if args.resume and os.path.exists(output_file):
+    if args.resume and not write_header:
         try:
-            existing = pd.read_csv(output_file)
-            existing_uids = set(existing['match_uid'].dropna().astype(str))
-            log(f"Resuming: {len(existing_uids):,} already scraped, skipping")
-        except:
+            existing_uids = load_scraped_uids(output_file)
+            keep_sidecar = True
+        except (OSError, StopIteration, ValueError, csv.Error):
             pass
+        log(f"Resuming: {len(existing_uids):,} already scraped, skipping")
 
     # Limit
     if args.limit > 0:
         df = df.head(args.limit)
         log(f"Limited to {args.limit} matches")
 
-    # Calculate how many we actually need to process
-    total_to_process = len(df) - len(existing_uids)
+    # Already-complete rows
+    if args.skip_complete:
+        complete = needs_no_fill(df)
+        log(f"Skipping {int(complete.sum()):,} matches with complete data")
+        df = df[~complete]
+
+    # Rows still to scrape (shard order, already-scraped skipped)
+    pending = [row for _, row in df.iterrows() if str(row['match_uid']) not in existing_uids]
+    total_to_process = len(pending)
     log(f"Matches to process: {total_to_process:,}")
 
-    # Create driver
-    driver = create_driver()
+    # Shard output stays open for the whole run
+    out_fh = open(output_file, 'a', newline='', buffering=1 << 16)
+    writer = csv.DictWriter(out_fh, fieldnames=RESULT_FIELDS, lineterminator='\n')
+    if write_header:
+        writer.writeheader()
+    # A new (or emptied) shard CSV starts a new sidecar too. A stale one is
+    # dropped for this run and rebuilt by the next --resume.
+    if keep_sidecar:
+        uids_fh = open(uids_path(output_file), 'w' if write_header else 'a')
+    else:
+        uids_fh = None
+        if os.path.exists(uids_path(output_file)):
+            os.remove(uids_path(output_file))
+
+    # HTTP session for the whole shard; the Selenium driver (or worker
+    # pool) is only created if a page needs the fallback
+    loop = asyncio.new_event_loop()
+    session = loop.run_until_complete(open_session())
+    driver = None
+    pool = None
 
     results = []
     processed = 0
@@ -590,94 +1018,130 @@ def main():
              'tb_found': 0, 'time_found': 0, 'surface_found': 0}
 
     try:
-        for idx, row in df.iterrows():
+        for start in range(0, len(pending), SAVE_EVERY):
             if SHUTDOWN_REQUESTED:
                 log("Shutdown requested. Stopping...")
                 break
 
-            match_uid = str(row['match_uid'])
-            if match_uid in existing_uids:
-                continue
-
-            url = row['match_url']
-            csv_home_name = str(row.get('player_home', ''))
-            csv_away_name = str(row.get('player_away', ''))
-            csv_home_id = str(row.get('player_home_id', ''))
-            csv_away_id = str(row.get('player_away_id', ''))
-
-            processed += 1
-
-            # Scrape everything from this page
-            info, driver = scrape_match_page(driver, url)
-
-            pct = (processed / total_to_process * 100) if total_to_process > 0 else 0
-
-            if info['error']:
-                stats['errors'] += 1
-                ha_status = 'error'
-                ha_method = None
-                log(f"  [{processed}/{total_to_process}] ({pct:.1f}%) ERROR: {info['error']}")
+            batch = pending[start:start + SAVE_EVERY]
+            # Cache key per row (None = don't read or write the cache)
+            cache_uids = [str(row['match_uid']) if args.cache else None for row in batch]
+            infos = loop.run_until_complete(
+                fetch_matches(session, [row['match_url'] for row in batch], cache_uids))
+
+            # Static HTML didn't have the data — scrape those with Selenium
+            fallback = [i for i, info in enumerate(infos) if info is None]
+            if fallback and args.workers > 1:
+                tasks = [(i, batch[i]['match_url'], cache_uids[i]) for i in fallback]
+                if pool is None:
+                    # Fail fast on a broken Chrome/chromedriver setup before
+                    # any worker tries to start one
+                    create_driver().quit()
+                    for _, url, _ in tasks:
+                        limiter_for(url)  # Workers get the limiters that exist now
+                    pool = multiprocessing.Pool(args.workers, initializer=init_worker,
+                                                initargs=(LIMITERS,))
+                for i, info in pool.imap_unordered(scrape_in_worker, tasks, chunksize=4):
+                    infos[i] = info
+                    if SHUTDOWN_REQUESTED:
+                        break
             else:
-                ha_status, ha_method = determine_home_away_status(
-                    csv_home_id, csv_away_id, info['page_home_id'], info['page_away_id'],
-                    csv_home_name, csv_away_name, info['page_home_name'], info['page_away_name']
-                )
-                if ha_status == 'correct':
-                    stats['correct'] += 1
-                elif ha_status == 'swapped':
-                    stats['swapped'] += 1
+                for i in fallback:
+                    if SHUTDOWN_REQUESTED:
+                        break
+                    if driver is None:
+                        driver = create_driver()
+                    infos[i], driver = scrape_match_page(driver, batch[i]['match_url'], cache_uids[i])
+
+            for row, info in zip(batch, infos):
+                if info is None:
+                    continue  # Fallback cut short by shutdown; picked up by --resume
+
+                match_uid = str(row['match_uid'])
+                csv_home_name = str(row.get('player_home', ''))
+                csv_away_name = str(row.get('player_away', ''))
+                csv_home_id = str(row.get('player_home_id', ''))
+                csv_away_id = str(row.get('player_away_id', ''))
+
+                processed += 1
+
+                pct = (processed / total_to_process * 100) if total_to_process > 0 else 0
+
+                if info['error']:
+                    stats['errors'] += 1
+                    ha_status = 'error'
+                    ha_method = None
+                    log(f"  [{processed}/{total_to_process}] ({pct:.1f}%) ERROR: {info['error']}")
                 else:
-                    stats['unknown'] += 1
-
-                # Count TB and time finds
-                if any(info.get(f'page_set{n}_tb_{s}') for n in [1,2,3] for s in ['home','away']):
-                    stats['tb_found'] += 1
-                if info.get('page_time_overall'):
-                    stats['time_found'] += 1
-                if info.get('page_court_type'):
-                    stats['surface_found'] += 1
-
-                log(f"  [{processed}/{total_to_process}] ({pct:.1f}%) {ha_status.upper()} | "
-                    f"{csv_home_name} vs {csv_away_name}")
-
-            # Build result row
-            result_row = {
-                'match_uid': match_uid,
-                'ha_status': ha_status,
-                'ha_method': ha_method,
-                'csv_home_name': csv_home_name,
-                'csv_home_id': csv_home_id,
-                'csv_away_name': csv_away_name,
-                'csv_away_id': csv_away_id,
-            }
-            # Add all page_ fields
-            for k, v in info.items():
-                result_row[k] = v
-
-            results.append(result_row)
-
-            # Periodic save
-            if len(results) >= SAVE_EVERY:
-                save_results(output_file, results)
-                log(f"  ** SAVED {SAVE_EVERY} | C:{stats['correct']} S:{stats['swapped']} "
-                    f"U:{stats['unknown']} E:{stats['errors']} | "
-                    f"TB:{stats['tb_found']} T:{stats['time_found']} Srf:{stats['surface_found']} | {pct:.1f}% done **")
-                results = []
-
-            time.sleep(random.uniform(*DELAY_BETWEEN_MATCHES))
-
-    except KeyboardInterrupt:
-        log("Interrupted — saving progress...")
+                    ha_status, ha_method = determine_home_away_status(
+                        csv_home_id, csv_away_id, info['page_home_id'], info['page_away_id'],
+                        csv_home_name, csv_away_name, info['page_home_name'], info['page_away_name']
+                    )
+                    if ha_status == 'correct':
+                        stats['correct'] += 1
+                    elif ha_status == 'swapped':
+                        stats['swapped'] += 1
+                    else:
+                        stats['unknown'] += 1
+
+                    # Count TB and time finds
+                    if any(info.get(f'page_set{n}_tb_{s}') for n in [1,2,3] for s in ['home','away']):
+                        stats['tb_found'] += 1
+                    if info.get('page_time_overall'):
+                        stats['time_found'] += 1
+                    if info.get('page_court_type'):
+                        stats['surface_found'] += 1
+
+                    log(f"  [{processed}/{total_to_process}] ({pct:.1f}%) {ha_status.upper()} | "
+                        f"{csv_home_name} vs {csv_away_name}")
+
+                # Build result row
+                result_row = {
+                    'match_uid': match_uid,
+                    'ha_status': ha_status,
+                    'ha_method': ha_method,
+                    'csv_home_name': csv_home_name,
+                    'csv_home_id': csv_home_id,
+                    'csv_away_name': csv_away_name,
+                    'csv_away_id': csv_away_id,
+                }
+                # Add all page_ fields
+                for k, v in info.items():
+                    result_row[k] = v
+
+                results.append(result_row)
+
+                # Periodic save
+                if len(results) >= SAVE_EVERY:
+                    save_results(out_fh, writer, uids_fh, results)
+                    log(f"  ** SAVED {SAVE_EVERY} | C:{stats['correct']} S:{stats['swapped']} "
+                        f"U:{stats['unknown']} E:{stats['errors']} | "
+                        f"TB:{stats['tb_found']} T:{stats['time_found']} Srf:{stats['surface_found']} | {pct:.1f}% done **")
+                    results = []
 
     finally:
         if results:
-            save_results(output_file, results)
+            save_results(out_fh, writer, uids_fh, results)
             log(f"Saved final {len(results)} results")
+        out_fh.close()
+        if uids_fh is not None:
+            uids_fh.close()
 
-        try:
-            driver.quit()
-        except:
-            pass
+        loop.run_until_complete(session.close())
+        loop.close()
+
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+        if pool is not None:
+            if SHUTDOWN_REQUESTED:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
 
         log(f"\n{'='*60}")
         log(f"  SUMMARY — Shard {args.shard}/{args.total_shards}")
@@ -693,13 +1157,89 @@ def main():
         log(f"  Output:       {output_file}")
 
 
-def save_results(output_file, results):
-    """Append results to CSV."""
-    df_new = pd.DataFrame(results)
-    if os.path.exists(output_file):
-        df_new.to_csv(output_file, mode='a', index=False, header=False)
-    else:
-        df_new.to_csv(output_file, index=False)
+def save_results(out_fh, writer, uids_fh, results):
+    """
+    Append results to the open shard CSV and flush them to disk. With a
+    .uids sidecar, their uids follow, then the CSV's new byte size.
+    """
+    writer.writerows(results)
+    out_fh.flush()
+    if uids_fh is not None:
+        uids_fh.writelines(f"{r['match_uid']}\n" for r in results)
+        uids_fh.write(f"#{os.fstat(out_fh.fileno()).st_size}\n")
+        uids_fh.flush()
+
+
+def uids_path(output_file):
+    return f"{output_file}.uids"
+
+
+def sidecar_is_current(output_file):
+    """
+    True if the .uids sidecar ends with the shard CSV's current byte size,
+    i.e. nothing was written to the CSV since the sidecar's last save.
+    """
+    try:
+        with open(uids_path(output_file), 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 64, 0))
+            last = f.read().splitlines()[-1:]
+        return last == [f"#{os.path.getsize(output_file)}".encode()]
+    except OSError:
+        return False
+
+
+def load_scraped_uids(output_file):
+    """
+    match_uids already in a shard CSV.
+
+    Read from the .uids sidecar (one uid per line, "#<CSV size>" after each
+    save) when it matches the CSV's size. Otherwise (no sidecar, or one left
+    over from another CSV / an interrupted save) rebuild it by streaming the
+    CSV's match_uid column.
+    """
+    sidecar = uids_path(output_file)
+    if sidecar_is_current(output_file):
+        with open(sidecar) as f:
+            return {line for line in f.read().splitlines() if line and not line.startswith('#')}
+    if os.path.exists(sidecar):
+        log(f"  {sidecar} is out of date — rebuilding it")
+
+    with open(output_file, newline='') as f:
+        reader = csv.reader(f)
+        uid_col = next(reader).index('match_uid')
+        uids = {row[uid_col] for row in reader if len(row) > uid_col and row[uid_col]}
+    with open(sidecar, 'w') as f:
+        f.writelines(f"{uid}\n" for uid in uids)
+        f.write(f"#{os.path.getsize(output_file)}\n")
+    return uids
+
+
+def needs_no_fill(df):
+    """
+    True for rows where --apply would have nothing to fill: date, surface and
+    overall time present, plus the time of every played set and both TB
+    scores of every 7-6 set. Expects the all-text frame main() reads.
+    """
+    if not set(SET_SCORE_COLS) <= set(df.columns):
+        return np.zeros(len(df), dtype=bool)
+
+    def has(col):
+        if col not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        return (df[col].str.strip() != '').to_numpy(dtype=bool)
+
+    def games(col):
+        return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    complete = has('list_date_time') & has('court_type') & has('time_overall')
+    for n in (1, 2, 3):
+        home, away = games(f'home_set{n}'), games(f'away_set{n}')
+        played = ~np.isnan(home)
+        tiebreak = ((home == 7) & (away == 6)) | ((home == 6) & (away == 7))
+        complete &= ~played | has(f'time_set{n}')
+        complete &= ~tiebreak | (has(f'home_set{n}_tb') & has(f'away_set{n}_tb'))
+    return complete
 
 
 if __name__ == "__main__":
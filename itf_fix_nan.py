@@ -19,13 +19,42 @@ Usage:
     python itf_fix_nan.py
     python itf_fix_nan.py --input ITF_file.csv --output ITF_file_fixed.csv
     python itf_fix_nan.py --dry-run   # Report only, don't write
+    python itf_fix_nan.py --format parquet   # Write ITF_file.parquet alongside the CSV
+    python itf_fix_nan.py --chunksize 100000   # Stream large files instead of loading them whole
+
+With numba installed (pip install numba) all rules are applied in a single
+parallel pass over the rows; otherwise they run rule by rule in NumPy.
+numexpr (pip install numexpr), if present, speeds up the tiebreak detection,
+and polars (pip install polars) writes the output CSV several times faster.
+pyarrow (pip install pyarrow) parses the input in parallel and is required
+for --format parquet; without it the input is read with pandas' C parser.
 """
 
 import os
 import argparse
 import pandas as pd
 import numpy as np
-from datetime import datetime
+from time import strftime
+
+try:
+    from numba import njit, prange  # Optional: fused single-pass rules kernel
+except ImportError:
+    njit = None
+
+try:
+    import numexpr  # Optional: evaluates the tiebreak-score test in one pass
+except ImportError:
+    numexpr = None
+
+try:
+    import polars as pl  # Optional: multithreaded CSV writer
+except ImportError:
+    pl = None
+
+try:
+    import pyarrow  # Optional: parallel CSV parse; needed for --format parquet
+except ImportError:
+    pyarrow = None
 
 
 # ============================================
@@ -59,276 +88,355 @@ CONDITIONAL_NAN_PAIRS = {
 
 SIDES = ['home', 'away']
 
+# Stat column names, generated once from the schema above; fix_frame keeps
+# the ones present in the file
+PER_SET_COLS = {n: [f'{side}_s{n}_{stat}' for side in SIDES for stat in PER_SET_STATS]
+                for n in (1, 2, 3)}
+TB_PER_SET_COLS = {n: [f'{side}_s{n}_{stat}' for side in SIDES for stat in TB_STATS]
+                   for n in (1, 2, 3)}
+OVERALL_TB_COLS = [f'{side}_{stat}' for side in SIDES for stat in TB_STATS]
+S1_MP_COLS = [f'{side}_s1_mp_{stat}' for side in SIDES
+              for stat in ['saved', 'faced', 'converted', 'opportunities']]
 
-def log(msg):
-    ts = datetime.now().strftime('%H:%M:%S')
-    print(f"[{ts}] {msg}")
-
+# A set went to a tiebreak if it finished 7-6 or 6-7 (missing scores are -1)
+TB_SCORE_EXPR = "((h == 7) & (a == 6)) | ((h == 6) & (a == 7))"
 
-def count_nans(df, columns):
-    """Count NaN cells in specified columns."""
-    return df[columns].isna().sum().sum()
 
+def log(msg):
+    print(f"[{strftime('%H:%M:%S')}] {msg}")
 
-def main():
-    parser = argparse.ArgumentParser(description="Fix 0 → NaN in ITF match record")
-    parser.add_argument("--input", default="ITF_Flashscore_2019on_MatchRecord_FIXED_with_scores_and_sets.csv")
-    parser.add_argument("--output", default=None, help="Output file (default: overwrite input with backup)")
-    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
-    args = parser.parse_args()
 
-    log(f"Loading {args.input}...")
-    df = pd.read_csv(args.input, low_memory=False)
-    log(f"Loaded {len(df):,} matches, {len(df.columns)} columns")
+# ============================================
+# RULE EXECUTION
+# ============================================
+# Every rule is (row mask, target columns) over the float32 stat block:
+#   STAMP      target → NaN on masked rows
+#   ZERO       target → NaN on masked rows where it is 0
+#   ZERO_PAIR  target → NaN where it AND its base column are 0
+# Rules run in order, and only interact within a row, so running them
+# row by row (numba) or rule by rule (NumPy) gives the same result.
+
+STAMP, ZERO, ZERO_PAIR = 0, 1, 2
+
+
+def apply_rules_numpy(arr, masks, kinds, cell_rule, cell_col, cell_base):
+    """Rule-by-rule NumPy version. Returns cells fixed per rule."""
+    fixed = np.zeros(len(kinds), dtype=np.int64)
+    for r, kind in enumerate(kinds):
+        sel = cell_rule == r
+        cols = cell_col[sel]
+        if not len(cols):
+            continue
+        rows = masks[r]
+        block = arr[:, cols]
+        if kind == STAMP:
+            hit = rows[:, None] & ~np.isnan(block)
+        else:
+            # NaN == 0 is False, so these also require the cells to be present
+            hit = rows[:, None] & (block == 0)
+            if kind == ZERO_PAIR:
+                hit &= arr[:, cell_base[sel]] == 0
+        block[hit] = np.nan
+        arr[:, cols] = block
+        fixed[r] = int(hit.sum())
+    return fixed
+
+
+def _apply_rules_rows(arr, masks, kinds, cell_rule, cell_col, cell_base):
+    """All rules in one pass over rows (compiled with numba below)."""
+    fixed = np.zeros((arr.shape[0], len(kinds)), dtype=np.int64)
+    for i in prange(arr.shape[0]):
+        for k in range(len(cell_col)):
+            r = cell_rule[k]
+            if not masks[r, i]:
+                continue
+            v = arr[i, cell_col[k]]
+            if kinds[r] == STAMP:
+                if np.isnan(v):
+                    continue
+            elif v != 0 or (kinds[r] == ZERO_PAIR and arr[i, cell_base[k]] != 0):
+                continue
+            arr[i, cell_col[k]] = np.nan
+            fixed[i, r] += 1
+    return fixed.sum(axis=0)
+
+
+if njit is not None:
+    apply_rules_numba = njit(parallel=True, cache=True)(_apply_rules_rows)
+
+
+def score_int8(col):
+    """Set-score column as int8, with -1 for missing / non-numeric scores."""
+    scores = pd.to_numeric(col, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(scores), -1, scores).astype(np.int8)
+
+
+def fix_frame(df, say=log, float_stats=False):
+    """
+    Apply Rules 1-7 to df in place.
+
+    Returns the per-rule cells fixed ('rules'), zero/NaN counts before and
+    after, and the validation residuals — all plain sums, so a chunked run
+    can add them up across chunks.
+    """
+    column_set = set(df.columns)  # Membership tests below, instead of scanning the Index
 
-    # Track changes
-    total_cells_fixed = 0
     change_log = {}
 
     # Identify all stat columns (cols 28+)
     stat_cols = list(df.columns[28:])
-    initial_zeros = (df[stat_cols] == 0).sum().sum()
-    initial_nans = df[stat_cols].isna().sum().sum()
-    log(f"Before fix: {initial_zeros:,} zeros, {initial_nans:,} NaNs in stat columns")
+
+    # Every rule works on one float32 copy of the stat block (all stats are
+    # small integer counts, so float32 is exact); col_index maps name → column
+    arr = df[stat_cols].to_numpy(dtype=np.float32, copy=True)
+    col_index = {c: i for i, c in enumerate(stat_cols)}
+
+    initial_zeros = int(np.count_nonzero(arr == 0))
+    initial_nans = int(np.count_nonzero(np.isnan(arr)))
+    say(f"Before fix: {initial_zeros:,} zeros, {initial_nans:,} NaNs in stat columns")
+
+    def idx(columns):
+        return [col_index[c] for c in columns if c in col_index]
+
+    # Rules are collected here, then applied together below
+    rule_names, rule_kinds, rule_masks = [], [], []
+    cell_rule, cell_col, cell_base = [], [], []
+
+    def add_rule(name, kind, rows, cols, bases=None):
+        rows = np.asarray(rows, dtype=bool)
+        change_log.setdefault(name, 0)
+        if not len(cols) or not rows.any():
+            return  # Nothing to fix (e.g. a re-run on an already-fixed file)
+        r = len(rule_names)
+        rule_names.append(name)
+        rule_kinds.append(kind)
+        rule_masks.append(rows)
+        cell_rule.extend([r] * len(cols))
+        cell_col.extend(cols)
+        cell_base.extend(bases if bases is not None else [-1] * len(cols))
+
+    all_rows = np.ones(len(df), dtype=bool)
 
     # ========================================
     # RULE 1: s3 columns → NaN for matches without Set 3
     # ========================================
-    log("Rule 1: Setting s3 stats to NaN for matches without Set 3...")
+    say("Rule 1: Setting s3 stats to NaN for matches without Set 3...")
     
-    # Matches without a complete Set 3
-    no_s3 = df['home_set3'].isna() | (df['match_score'].isin(['2-0', '0-2']))
-    # Also handle incomplete matches where Set 3 wasn't played
-    no_s3 = no_s3 | (df['match_score'].isin(['1-0', '0-1', '0-0']))
-    # 1-1 matches might need special handling - check if Set 3 was actually played
-    mask_11 = df['match_score'] == '1-1'
-    no_s3_11 = mask_11 & df['home_set3'].isna()
-    no_s3 = no_s3 | no_s3_11
-
-    s3_cols = [c for c in stat_cols if '_s3_' in c]
-    cells_before = count_nans(df, s3_cols)
-    for col in s3_cols:
-        df.loc[no_s3, col] = np.nan
-    cells_after = count_nans(df, s3_cols)
-    fixed = cells_after - cells_before
-    total_cells_fixed += fixed
-    change_log['Rule 1: s3 for non-3-set matches'] = fixed
-    log(f"  → {fixed:,} cells fixed ({no_s3.sum():,} matches affected)")
+    # A handful of distinct scores: as a categorical, the isin/== tests
+    # below compare small integer codes instead of hashing every string
+    match_score = df['match_score'].astype('category')
+
+    # Matches without a complete Set 3: 2-set scores, plus incomplete matches
+    # where Set 3 wasn't played. A 1-1 match with no Set 3 score (it was
+    # never played) is already caught by the isna() test.
+    no_s3 = (df['home_set3'].isna().to_numpy()
+             | match_score.isin(['2-0', '0-2', '1-0', '0-1', '0-0']).to_numpy())
+
+    s3_cols = [c for c in PER_SET_COLS[3] if c in col_index]
+    add_rule('Rule 1: s3 for non-3-set matches', STAMP, no_s3, idx(s3_cols))
+    say(f"  → {no_s3.sum():,} matches affected")
 
     # ========================================
     # RULE 1b: s2 columns → NaN for matches without Set 2
     # ========================================
-    log("Rule 1b: Setting s2 stats to NaN for matches without Set 2...")
-    no_s2 = df['home_set2'].isna() | (df['match_score'].isin(['0-0']))
-    # 1-0 or 0-1 with no set2 data
-    mask_10_01 = df['match_score'].isin(['1-0', '0-1'])
-    no_s2_partial = mask_10_01 & df['home_set2'].isna()
-    no_s2 = no_s2 | no_s2_partial
-
-    s2_cols = [c for c in stat_cols if '_s2_' in c]
-    cells_before = count_nans(df, s2_cols)
-    for col in s2_cols:
-        df.loc[no_s2, col] = np.nan
-    cells_after = count_nans(df, s2_cols)
-    fixed = cells_after - cells_before
-    total_cells_fixed += fixed
-    change_log['Rule 1b: s2 for non-2-set matches'] = fixed
-    log(f"  → {fixed:,} cells fixed ({no_s2.sum():,} matches affected)")
+    say("Rule 1b: Setting s2 stats to NaN for matches without Set 2...")
+    # (1-0 or 0-1 with no set2 data is covered by the isna() test)
+    no_s2 = df['home_set2'].isna().to_numpy() | (match_score == '0-0').to_numpy()
+
+    s2_cols = [c for c in PER_SET_COLS[2] if c in col_index]
+    add_rule('Rule 1b: s2 for non-2-set matches', STAMP, no_s2, idx(s2_cols))
+    say(f"  → {no_s2.sum():,} matches affected")
 
     # ========================================
     # RULE 2: Per-set TB columns → NaN for non-TB sets
     # ========================================
-    log("Rule 2: Setting per-set TB stats to NaN for non-tiebreak sets...")
+    say("Rule 2: Setting per-set TB stats to NaN for non-tiebreak sets...")
 
-    tb_per_set_cols = {}
-    for set_n in [1, 2, 3]:
-        tb_per_set_cols[set_n] = [f'{side}_s{set_n}_{stat}' 
-                                   for side in SIDES for stat in TB_STATS
-                                   if f'{side}_s{set_n}_{stat}' in df.columns]
+    tb_per_set_cols = {set_n: [c for c in cols if c in column_set]
+                       for set_n, cols in TB_PER_SET_COLS.items()}
 
-    rule2_fixed = 0
+    # Per-set scores, played and tiebreak (7-6 or 6-7) masks, shared by
+    # Rules 2, 3 and 5
+    set_scores = {}
+    set_played = {}
+    is_tb = {}
     for set_n in [1, 2, 3]:
         h_col, a_col = f'home_set{set_n}', f'away_set{set_n}'
-        if h_col not in df.columns:
+        if h_col not in column_set:
             continue
-        
-        # Set was played but NOT a tiebreak (not 7-6 or 6-7)
-        set_played = df[h_col].notna() & df[a_col].notna()
-        is_tb = ((df[h_col] == 7) & (df[a_col] == 6)) | ((df[h_col] == 6) & (df[a_col] == 7))
-        not_tb = set_played & ~is_tb
+        h, a = set_scores[set_n] = score_int8(df[h_col]), score_int8(df[a_col])
+        set_played[set_n] = (h >= 0) & (a >= 0)
+        if numexpr is not None:
+            is_tb[set_n] = numexpr.evaluate(TB_SCORE_EXPR, local_dict={'h': h, 'a': a})
+        else:
+            is_tb[set_n] = ((h == 7) & (a == 6)) | ((h == 6) & (a == 7))
+
+    for set_n in is_tb:
+        # Set was played but NOT a tiebreak
+        not_tb = set_played[set_n] & ~is_tb[set_n]
 
         cols = tb_per_set_cols.get(set_n, [])
         if cols:
-            cells_before = count_nans(df, cols)
-            for col in cols:
-                df.loc[not_tb, col] = np.nan
-            cells_after = count_nans(df, cols)
-            fixed = cells_after - cells_before
-            rule2_fixed += fixed
-            log(f"  Set {set_n}: {fixed:,} cells fixed ({not_tb.sum():,} non-TB sets)")
-
-    total_cells_fixed += rule2_fixed
-    change_log['Rule 2: per-set TB for non-TB sets'] = rule2_fixed
+            add_rule('Rule 2: per-set TB for non-TB sets', STAMP, not_tb, idx(cols))
+            say(f"  Set {set_n}: {not_tb.sum():,} non-TB sets")
 
     # ========================================
     # RULE 3: Overall TB columns → NaN if no TB in entire match
     # ========================================
-    log("Rule 3: Setting overall TB stats to NaN for matches with no tiebreaks...")
-
-    # A match has a TB if any set is 7-6 or 6-7
-    has_tb_s1 = ((df['home_set1'] == 7) & (df['away_set1'] == 6)) | ((df['home_set1'] == 6) & (df['away_set1'] == 7))
-    has_tb_s2 = ((df['home_set2'] == 7) & (df['away_set2'] == 6)) | ((df['home_set2'] == 6) & (df['away_set2'] == 7))
-    has_tb_s3 = False  # Default
-    if 'home_set3' in df.columns:
-        has_tb_s3 = ((df['home_set3'] == 7) & (df['away_set3'] == 6)) | ((df['home_set3'] == 6) & (df['away_set3'] == 7))
-    
-    # Fill NaN in bool series with False
-    has_tb_s1 = has_tb_s1.fillna(False)
-    has_tb_s2 = has_tb_s2.fillna(False)
-    if isinstance(has_tb_s3, pd.Series):
-        has_tb_s3 = has_tb_s3.fillna(False)
+    say("Rule 3: Setting overall TB stats to NaN for matches with no tiebreaks...")
 
-    no_tb_match = ~(has_tb_s1 | has_tb_s2 | has_tb_s3)
+    # A match has a TB if any set is 7-6 or 6-7 (missing scores never match)
+    no_tb_match = ~np.logical_or.reduce(list(is_tb.values()))
 
-    overall_tb_cols = [f'{side}_{stat}' for side in SIDES for stat in TB_STATS
-                       if f'{side}_{stat}' in df.columns]
+    overall_tb_cols = [c for c in OVERALL_TB_COLS if c in column_set]
     
-    cells_before = count_nans(df, overall_tb_cols)
-    for col in overall_tb_cols:
-        df.loc[no_tb_match, col] = np.nan
-    cells_after = count_nans(df, overall_tb_cols)
-    fixed = cells_after - cells_before
-    total_cells_fixed += fixed
-    change_log['Rule 3: overall TB for no-TB matches'] = fixed
-    log(f"  → {fixed:,} cells fixed ({no_tb_match.sum():,} matches)")
+    add_rule('Rule 3: overall TB for no-TB matches', STAMP, no_tb_match, idx(overall_tb_cols))
+    say(f"  → {no_tb_match.sum():,} matches")
 
     # ========================================
     # RULE 4: s1_mp_* → ALWAYS NaN (match point impossible in Set 1)
     # ========================================
-    log("Rule 4: Setting s1_mp to NaN (match point impossible in Set 1)...")
+    say("Rule 4: Setting s1_mp to NaN (match point impossible in Set 1)...")
 
-    s1_mp_cols = [f'{side}_s1_mp_{stat}' for side in SIDES 
-                  for stat in ['saved', 'faced', 'converted', 'opportunities']
-                  if f'{side}_s1_mp_{stat}' in df.columns]
+    s1_mp_cols = [c for c in S1_MP_COLS if c in column_set]
 
-    cells_before = count_nans(df, s1_mp_cols)
-    for col in s1_mp_cols:
-        df[col] = np.nan
-    cells_after = count_nans(df, s1_mp_cols)
-    fixed = cells_after - cells_before
-    total_cells_fixed += fixed
-    change_log['Rule 4: s1_mp always NaN'] = fixed
-    log(f"  → {fixed:,} cells fixed")
+    add_rule('Rule 4: s1_mp always NaN', STAMP, all_rows, idx(s1_mp_cols))
 
     # ========================================
     # RULE 5: s2_mp logic based on Set 1 winner
     # ========================================
-    log("Rule 5: Setting s2_mp based on Set 1 winner/loser...")
-
-    rule5_fixed = 0
-    for idx in df.index:
-        h_s1 = df.at[idx, 'home_set1']
-        a_s1 = df.at[idx, 'away_set1']
-        
-        if pd.isna(h_s1) or pd.isna(a_s1):
-            continue
-        
-        try:
-            h_s1, a_s1 = int(h_s1), int(a_s1)
-        except (ValueError, TypeError):
-            continue
-        
-        if h_s1 > a_s1:
-            set1_winner, set1_loser = 'home', 'away'
-        elif a_s1 > h_s1:
-            set1_winner, set1_loser = 'away', 'home'
-        else:
-            continue  # Tied set shouldn't happen in completed matches
-        
-        # Match point logic in best-of-3 Set 2:
-        # Set 1 WINNER leads 1-0. In Set 2, they can earn match points (one set from winning).
-        # Set 1 LOSER trails 0-1. Even winning Set 2 only gives 1-1. CANNOT earn match points.
-        #
-        # Therefore:
-        # - set1_winner's mp_faced/mp_saved in S2 → NaN
-        #   (loser is down 0-1, can't create match points against winner)
-        # - set1_loser's mp_faced/mp_saved in S2 → VALID
-        #   (winner IS up 1-0, CAN create match points the loser must face/save)
-        for stat in ['mp_faced', 'mp_saved']:
-            col = f'{set1_winner}_s2_{stat}'
-            if col in df.columns and df.at[idx, col] == 0:
-                df.at[idx, col] = np.nan
-                rule5_fixed += 1
-
-    total_cells_fixed += rule5_fixed
-    change_log['Rule 5: s2_mp winner/loser logic'] = rule5_fixed
-    log(f"  → {rule5_fixed:,} cells fixed")
+    say("Rule 5: Setting s2_mp based on Set 1 winner/loser...")
+
+    # Match point logic in best-of-3 Set 2:
+    # Set 1 WINNER leads 1-0. In Set 2, they can earn match points (one set from winning).
+    # Set 1 LOSER trails 0-1. Even winning Set 2 only gives 1-1. CANNOT earn match points.
+    #
+    # Therefore:
+    # - set1_winner's mp_faced/mp_saved in S2 → NaN
+    #   (loser is down 0-1, can't create match points against winner)
+    # - set1_loser's mp_faced/mp_saved in S2 → VALID
+    #   (winner IS up 1-0, CAN create match points the loser must face/save)
+    # Non-numeric / missing Set 1 scores (-1) match neither side and are left alone.
+    h_s1, a_s1 = set_scores[1]
+    set1_winner = {'home': (h_s1 > a_s1) & (a_s1 >= 0), 'away': (a_s1 > h_s1) & (h_s1 >= 0)}
+
+    for side, won_s1 in set1_winner.items():
+        add_rule('Rule 5: s2_mp winner/loser logic', ZERO, won_s1,
+                 idx([f'{side}_s2_{stat}' for stat in ['mp_faced', 'mp_saved']]))
 
     # ========================================
     # RULE 6: saved → NaN when faced == 0
     # RULE 7: converted → NaN when opportunities == 0
     # (Only BP has converted/opportunities; SP and MP only have saved/faced)
     # ========================================
-    log("Rules 6-7: Conditional NaN for bp/sp/mp saved/converted...")
+    say("Rules 6-7: Conditional NaN for bp/sp/mp saved/converted...")
 
-    rule67_fixed = 0
+    # (value, base) column pairs: saved/faced, plus converted/opportunities
+    # for BP. Value columns are never a base, so the pairs don't interact.
+    value_idx, base_idx = [], []
     for side in SIDES:
         for pt_type, cols in CONDITIONAL_NAN_PAIRS.items():
-            # Overall: saved → NaN if faced == 0
-            faced_col = f'{side}_{cols["faced_col"]}'
-            saved_col = f'{side}_{cols["saved_col"]}'
-            if faced_col in df.columns and saved_col in df.columns:
-                mask = (df[faced_col] == 0) & (df[saved_col] == 0) & df[saved_col].notna()
-                count = mask.sum()
-                df.loc[mask, saved_col] = np.nan
-                rule67_fixed += count
-
-            # Overall: converted → NaN if opportunities == 0 (BP only)
+            pairs = [(cols['saved_col'], cols['faced_col'])]
             if 'conv_col' in cols and 'opp_col' in cols:
-                opp_col = f'{side}_{cols["opp_col"]}'
-                conv_col = f'{side}_{cols["conv_col"]}'
-                if opp_col in df.columns and conv_col in df.columns:
-                    mask = (df[opp_col] == 0) & (df[conv_col] == 0) & df[conv_col].notna()
-                    count = mask.sum()
-                    df.loc[mask, conv_col] = np.nan
-                    rule67_fixed += count
-
-            # Per-set
-            for set_n in [1, 2, 3]:
-                prefix = f's{set_n}'
-                faced_col = f'{side}_{prefix}_{cols["faced_col"]}'
-                saved_col = f'{side}_{prefix}_{cols["saved_col"]}'
-                if faced_col in df.columns and saved_col in df.columns:
-                    mask = df[faced_col].notna() & (df[faced_col] == 0) & df[saved_col].notna() & (df[saved_col] == 0)
-                    count = mask.sum()
-                    df.loc[mask, saved_col] = np.nan
-                    rule67_fixed += count
-
-                if 'conv_col' in cols and 'opp_col' in cols:
-                    opp_col = f'{side}_{prefix}_{cols["opp_col"]}'
-                    conv_col = f'{side}_{prefix}_{cols["conv_col"]}'
-                    if opp_col in df.columns and conv_col in df.columns:
-                        mask = df[opp_col].notna() & (df[opp_col] == 0) & df[conv_col].notna() & (df[conv_col] == 0)
-                        count = mask.sum()
-                        df.loc[mask, conv_col] = np.nan
-                        rule67_fixed += count
-
-    total_cells_fixed += rule67_fixed
-    change_log['Rules 6-7: conditional bp/sp/mp NaN'] = rule67_fixed
-    log(f"  → {rule67_fixed:,} cells fixed")
+                pairs.append((cols['conv_col'], cols['opp_col']))
+            for prefix in ['', 's1_', 's2_', 's3_']:
+                for value_stat, base_stat in pairs:
+                    value_col, base_col = f'{side}_{prefix}{value_stat}', f'{side}_{prefix}{base_stat}'
+                    if value_col in col_index and base_col in col_index:
+                        value_idx.append(col_index[value_col])
+                        base_idx.append(col_index[base_col])
+
+    add_rule('Rules 6-7: conditional bp/sp/mp NaN', ZERO_PAIR, all_rows, value_idx, base_idx)
 
     # ========================================
-    # SUMMARY
+    # APPLY
     # ========================================
-    final_zeros = (df[stat_cols].fillna(-999) == 0).sum().sum()  # Don't count NaN as zero
-    final_nans = df[stat_cols].isna().sum().sum()
+    if not rule_names:
+        say("No rule matched any rows; nothing to apply")
+        fixed_per_rule = []
+    else:
+        rule_args = (arr, np.stack(rule_masks), np.array(rule_kinds, dtype=np.int64),
+                     np.array(cell_rule, dtype=np.int64), np.array(cell_col, dtype=np.int64),
+                     np.array(cell_base, dtype=np.int64))
+        if njit is not None:
+            say(f"Applying {len(rule_names)} rules (numba, single pass)...")
+            fixed_per_rule = apply_rules_numba(*rule_args)
+        else:
+            say(f"Applying {len(rule_names)} rules (NumPy)...")
+            fixed_per_rule = apply_rules_numpy(*rule_args)
+
+    for name, fixed in zip(rule_names, fixed_per_rule):
+        change_log[name] = change_log.get(name, 0) + int(fixed)
+
+    # Write back only columns that now hold NaNs; the rest are unchanged,
+    # and int columns stay int in the output. Chunked runs write every stat
+    # column as float so all chunks print the same way.
+    has_nan = np.isnan(arr).any(axis=0)
+    for col, j in col_index.items():
+        if has_nan[j] or float_stats:
+            df[col] = arr[:, j].astype(np.float64)
+
+    # Validation residuals (reported by main), counted on the stat block
+    # rather than by slicing the full frame
+    def present(rows, columns):
+        return int(np.count_nonzero(~np.isnan(arr[np.ix_(rows, idx(columns))])))
+
+    two_set_mask = match_score.isin(['2-0', '0-2']).to_numpy()
+    return {
+        'rules': change_log,
+        'initial_zeros': initial_zeros,
+        'initial_nans': initial_nans,
+        'final_zeros': int(np.count_nonzero(arr == 0)),  # NaN != 0, so NaNs aren't counted
+        'final_nans': int(np.count_nonzero(np.isnan(arr))),
+        's3_residual': present(two_set_mask, s3_cols),
+        's1_mp_residual': present(all_rows, s1_mp_cols),
+        'tb_residual': present(no_tb_match, overall_tb_cols),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fix 0 → NaN in ITF match record")
+    parser.add_argument("--input", default="ITF_Flashscore_2019on_MatchRecord_FIXED_with_scores_and_sets.csv")
+    parser.add_argument("--output", default=None, help="Output file (default: overwrite input with backup)")
+    parser.add_argument("--dry-run", action="store_true", help="Report changes without writing")
+    parser.add_argument("--format", choices=['csv', 'parquet'], default='csv',
+                        help="Output format (parquet defaults to <input>.parquet, input left as is)")
+    parser.add_argument("--chunksize", type=int, default=0,
+                        help="Stream the CSV this many rows at a time (0 = load it whole)")
+    args = parser.parse_args()
+    if args.chunksize and args.format == 'parquet':
+        parser.error("--chunksize only supports --format csv")
+    if args.format == 'parquet' and pyarrow is None:
+        parser.error("--format parquet needs pyarrow (pip install pyarrow)")
+
+    if args.format == 'parquet':
+        output_file = args.output or os.path.splitext(args.input)[0] + '.parquet'
+    else:
+        output_file = args.output or args.input
+
+    # Output is written here and swapped in with os.replace, so a crash never
+    # leaves a torn file and the input's inode (the backup hardlink) survives
+    tmp_file = f"{output_file}.tmp"
+    if args.chunksize:
+        counts = fix_chunked(args, tmp_file)
+    else:
+        log(f"Loading {args.input}...")
+        # Block-parallel Arrow parse into NumPy-backed columns; the stat block
+        # is narrowed to float32 in fix_frame, where the rules run
+        df = pd.read_csv(args.input, engine='pyarrow' if pyarrow is not None else 'c')
+        log(f"Loaded {len(df):,} matches, {len(df.columns)} columns")
+        counts = fix_frame(df)
 
+    # ========================================
+    # SUMMARY
+    # ========================================
+    change_log = counts['rules']
     log(f"\n{'='*60}")
     log(f"  FIX SUMMARY")
     log(f"{'='*60}")
-    log(f"  Total cells fixed (0 → NaN): {total_cells_fixed:,}")
-    log(f"  Before: {initial_zeros:,} zeros, {initial_nans:,} NaNs")
-    log(f"  After:  {final_zeros:,} zeros, {final_nans:,} NaNs")
+    log(f"  Total cells fixed (0 → NaN): {sum(change_log.values()):,}")
+    log(f"  Before: {counts['initial_zeros']:,} zeros, {counts['initial_nans']:,} NaNs")
+    log(f"  After:  {counts['final_zeros']:,} zeros, {counts['final_nans']:,} NaNs")
     log(f"")
     for rule, count in change_log.items():
         log(f"  {rule}: {count:,}")
@@ -339,19 +447,9 @@ def main():
     log(f"\n{'='*60}")
     log(f"  VALIDATION")
     log(f"{'='*60}")
-
-    # Check: no s3 stats should be non-NaN for 2-set matches
-    two_set_mask = df['match_score'].isin(['2-0', '0-2'])
-    s3_residual = df.loc[two_set_mask, s3_cols].notna().sum().sum()
-    log(f"  s3 non-NaN in 2-set matches: {s3_residual} (should be 0)")
-
-    # Check: s1_mp should all be NaN
-    s1_mp_residual = df[s1_mp_cols].notna().sum().sum()
-    log(f"  s1_mp non-NaN values: {s1_mp_residual} (should be 0)")
-
-    # Check: overall TB non-NaN in no-TB matches
-    tb_residual = df.loc[no_tb_match, overall_tb_cols].notna().sum().sum()
-    log(f"  Overall TB non-NaN in no-TB matches: {tb_residual} (should be ~0, may have anomalies)")
+    log(f"  s3 non-NaN in 2-set matches: {counts['s3_residual']} (should be 0)")
+    log(f"  s1_mp non-NaN values: {counts['s1_mp_residual']} (should be 0)")
+    log(f"  Overall TB non-NaN in no-TB matches: {counts['tb_residual']} (should be ~0, may have anomalies)")
 
     # ========================================
     # WRITE OUTPUT
@@ -359,18 +457,88 @@ def main():
     if args.dry_run:
         log("\n  DRY RUN — no file written.")
     else:
-        output_file = args.output or args.input
         if output_file == args.input:
-            # Create backup
-            backup = args.input.replace('.csv', f'_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv')
-            log(f"\n  Creating backup: {backup}")
-            import shutil
-            shutil.copy2(args.input, backup)
-        
+            backup_input(args.input)
+
+        if args.chunksize:
+            os.replace(tmp_file, output_file)
+            log(f"  ✅ Done. Chunks written to {output_file}.")
+            return
+
         log(f"  Writing to {output_file}...")
-        df.to_csv(output_file, index=False)
+        if args.format == 'parquet':
+            df.to_parquet(tmp_file, engine='pyarrow', compression='zstd',
+                          row_group_size=50_000, index=False)
+        else:
+            write_csv(df, tmp_file)
+        os.replace(tmp_file, output_file)
         log(f"  ✅ Done. {len(df):,} rows, {len(df.columns)} columns written.")
 
 
+def write_csv(df, path, append=False):
+    """
+    Write df as CSV (header only when not appending). Uses the multithreaded
+    polars writer when installed (its from_pandas needs pyarrow): for the
+    counts, scores and text in this file it matches to_csv byte for byte.
+    Datetimes (written differently) and mixed-type columns (not convertible)
+    go through pandas.
+    """
+    if pl is not None and pyarrow is not None and not any(dtype.kind in 'mM' for dtype in df.dtypes):
+        try:
+            out = pl.from_pandas(df)
+        except (ValueError, TypeError):
+            out = None
+        if out is not None:
+            with open(path, 'ab' if append else 'wb') as f:
+                out.write_csv(f, include_header=not append)
+            return
+    df.to_csv(path, index=False, mode='a' if append else 'w', header=not append)
+
+
+def backup_input(input_file):
+    backup = input_file.replace('.csv', f'_backup_{strftime("%Y%m%d_%H%M%S")}.csv')
+    log(f"\n  Creating backup: {backup}")
+    # A hardlink costs no I/O; the new output goes to a fresh inode via
+    # os.replace, so the backup keeps the original bytes
+    try:
+        os.link(input_file, backup)
+    except OSError:
+        import shutil  # Filesystem without hardlinks
+        shutil.copy2(input_file, backup)
+
+
+def fix_chunked(args, tmp_file):
+    """
+    Stream the CSV through fix_frame args.chunksize rows at a time (the rules
+    only look within a row), appending each fixed chunk to tmp_file.
+    Returns the counts summed over all chunks.
+    """
+    log(f"Streaming {args.input} in chunks of {args.chunksize:,} rows...")
+    totals = None
+    rows = 0
+    for n, chunk in enumerate(pd.read_csv(args.input, chunksize=args.chunksize)):
+        counts = fix_frame(chunk, say=lambda msg: None, float_stats=True)
+        if totals is None:
+            totals = counts
+        else:
+            for rule, fixed in counts['rules'].items():
+                totals['rules'][rule] = totals['rules'].get(rule, 0) + fixed
+            for key, value in counts.items():
+                if key != 'rules':
+                    totals[key] += value
+        if not args.dry_run:
+            write_csv(chunk, tmp_file, append=(n > 0))
+        rows += len(chunk)
+        log(f"  Chunk {n + 1}: {rows:,} rows done")
+    if totals is None:
+        # No chunks at all (header-only input): fix and write just the header,
+        # so the summary gets zero counts and the output still has its columns
+        header = pd.read_csv(args.input, nrows=0)
+        totals = fix_frame(header, say=lambda msg: None, float_stats=True)
+        if not args.dry_run:
+            write_csv(header, tmp_file)
+    return totals
+
+
 if __name__ == "__main__":
     main()
@@ -9,6 +9,10 @@ The Flashscore PAGE is the source of truth:
 This script visits each match URL and compares the page's home/away
 against the CSV's home/away. Produces a corrections report.
 
+Pages are fetched over plain HTTP (the players are in the server-rendered
+HTML); Selenium is only started for pages where that HTML lacks them, with
+up to --workers browsers scraping those pages in parallel.
+
 Usage (4 parallel shards):
     python itf_home_away_auditor.py --shard 0 --total-shards 4 --resume
     python itf_home_away_auditor.py --shard 1 --total-shards 4 --resume
@@ -21,13 +25,25 @@ After all shards finish, combine and apply:
 
 import os
 import re
+import csv
 import sys
 import time
+import zlib
+import queue
+import atexit
 import signal
 import random
+import asyncio
 import argparse
-import pandas as pd
+import operator
+import itertools
+import threading
+import urllib.parse
+import aiohttp
+from collections import deque
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from selectolax.lexbor import LexborHTMLParser
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -49,8 +65,21 @@ DELAY_BETWEEN_MATCHES = (0.4, 0.8)
 SAVE_EVERY = 50
 HEADLESS = True
 MAX_RETRIES = 3
-
-# Graceful shutdown
+PAGE_WAIT_TIMEOUT = 5  # Max wait for the participant block after a page load
+SELENIUM_WORKERS = 4  # Parallel browsers for pages that need the fallback
+
+# HTTP fetch path
+HTTP_CONCURRENCY = 32
+HTTP_TIMEOUT = 10
+REQUESTS_PER_SECOND = 8  # per host, before any backoff
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Graceful shutdown: Ctrl+C / SIGTERM only set this flag (handlers are
+# installed by main); the current batch is finished and saved, so
+# a page load or CSV write is never cut off halfway
 SHUTDOWN_REQUESTED = False
 
 def signal_handler(sig, frame):
@@ -58,21 +87,58 @@ def signal_handler(sig, frame):
     print("\n[SIGNAL] Shutdown requested. Finishing current match...")
     SHUTDOWN_REQUESTED = True
 
-signal.signal(signal.SIGINT, signal_handler)
-if hasattr(signal, 'SIGTERM'):
-    signal.signal(signal.SIGTERM, signal_handler)
+
+# Log lines are timestamped by the caller and written by one background
+# thread, which flushes stdout once per burst instead of per line
+LOG_QUEUE = queue.SimpleQueue()
 
 
 def log(msg):
     ts = datetime.now().strftime('%H:%M:%S')
-    print(f"[{ts}] {msg}")
+    LOG_QUEUE.put(f"[{ts}] {msg}\n")
+
+
+def _write_log_lines():
+    while True:
+        line = LOG_QUEUE.get()
+        if line is None:
+            break
+        sys.stdout.write(line)
+        if LOG_QUEUE.empty():
+            sys.stdout.flush()
+    sys.stdout.flush()
+
+
+def close_log():
+    """Write out everything still queued (registered with atexit)."""
+    LOG_QUEUE.put(None)
+    LOG_THREAD.join()
+
+
+LOG_THREAD = threading.Thread(target=_write_log_lines, name='log-writer', daemon=True)
+LOG_THREAD.start()
+atexit.register(close_log)
 
 
 # ============================================
 # SELENIUM SETUP
 # ============================================
 
-COOKIE_ACCEPTED = False
+_DRIVER_PATH = None
+_DRIVER_PATH_LOCK = threading.Lock()
+
+
+def driver_path():
+    """
+    Resolve chromedriver once per process (webdriver-manager does I/O on
+    every install()); the lock keeps fallback workers from racing a download.
+    """
+    global _DRIVER_PATH
+    with _DRIVER_PATH_LOCK:
+        if _DRIVER_PATH is None:
+            _DRIVER_PATH = ChromeDriverManager().install()
+    return _DRIVER_PATH
+
 
 def create_driver():
     options = webdriver.ChromeOptions()
@@ -83,20 +149,27 @@ def create_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
     options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
-    service = Service(ChromeDriverManager().install())
+    options.add_argument(f"user-agent={USER_AGENT}")
+    # Only the participant block is read — skip images, fonts and
+    # notification prompts, and return from driver.get() at DOMContentLoaded
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.fonts": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+    options.page_load_strategy = 'eager'
+    service = Service(driver_path())
     driver = webdriver.Chrome(service=service, options=options)
     driver.set_page_load_timeout(30)
     return driver
 
 
 def accept_cookies(driver):
-    global COOKIE_ACCEPTED
-    if COOKIE_ACCEPTED:
+    """Click the consent banner once per driver (each browser has its own)."""
+    if getattr(driver, 'cookies_accepted', False):
         return
+    driver.cookies_accepted = True  # Also when no banner is found: don't retry
     candidates = [
         (By.ID, "onetrust-accept-btn-handler"),
         (By.CSS_SELECTOR, '[aria-label="Accept all"]'),
@@ -106,32 +179,39 @@ def accept_cookies(driver):
         try:
             btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((by, sel)))
             driver.execute_script("arguments[0].click();", btn)
-            COOKIE_ACCEPTED = True
             log("Cookie consent accepted")
             return
         except:
             continue
-    COOKIE_ACCEPTED = True  # Don't retry
 
 
 def safe_get(driver, url, retries=MAX_RETRIES):
-    """Load URL with retries, recreating driver on failure."""
-    global COOKIE_ACCEPTED
+    """
+    Load URL with retries. A page-load timeout is retried on the same
+    driver; any other failure (dead session or chromedriver) recreates it.
+    """
     for attempt in range(retries):
         try:
+            pace_page_load()
             driver.get(url)
-            time.sleep(1.5 + random.uniform(0, 0.5))
+            # Wait for the participant block instead of a fixed pause; if it
+            # never renders, scrape_home_away reports the missing element
+            try:
+                WebDriverWait(driver, PAGE_WAIT_TIMEOUT).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, 'div.duelParticipant__home')))
+            except TimeoutException:
+                pass
             accept_cookies(driver)
             return driver
         except Exception as e:
             log(f"  safe_get attempt {attempt+1}/{retries} failed: {e}")
             if attempt < retries - 1:
-                try:
-                    driver.quit()
-                except:
-                    pass
-                driver = create_driver()
-                COOKIE_ACCEPTED = False
+                if not isinstance(e, TimeoutException):
+                    try:
+                        driver.quit()
+                    except:
+                        pass
+                    driver = create_driver()
                 time.sleep(2)
     return driver
 
@@ -150,14 +230,7 @@ def extract_id_from_href(href):
 
 def scrape_home_away(driver, url):
     """Scrape correct home/away from the Flashscore page DOM."""
-    result = {
-        'page_home_name': None,
-        'page_home_id': None,
-        'page_away_name': None,
-        'page_away_id': None,
-        'list_date_time': None,
-        'error': None,
-    }
+    result = empty_result()
 
     try:
         driver = safe_get(driver, url)
@@ -205,6 +278,213 @@ def scrape_home_away(driver, url):
     return result, driver
 
 
+# ============================================
+# SELENIUM FALLBACK POOL
+# ============================================
+# Each worker thread owns one driver, created on its first fallback page and
+# kept for the rest of the shard. Every driver.get() (retries included) first
+# takes the next free slot on a shared schedule, DELAY_BETWEEN_MATCHES apart:
+# the site sees the same request rate as one serial browser, but a load that
+# takes longer than the delay costs no extra sleep, and page latencies overlap.
+
+WORKER_STATE = threading.local()
+DRIVERS = {}  # worker thread ident → its current driver, quit at exit
+DRIVERS_LOCK = threading.Lock()
+PACE_LOCK = threading.Lock()
+NEXT_PAGE_LOAD = 0.0
+
+
+def pace_page_load():
+    """Wait for the next page-load slot; slots are DELAY_BETWEEN_MATCHES apart."""
+    global NEXT_PAGE_LOAD
+    with PACE_LOCK:
+        now = time.monotonic()
+        wait = max(0.0, NEXT_PAGE_LOAD - now)
+        NEXT_PAGE_LOAD = max(now, NEXT_PAGE_LOAD) + random.uniform(*DELAY_BETWEEN_MATCHES)
+    if wait:
+        time.sleep(wait)
+
+
+def register_driver(driver):
+    WORKER_STATE.driver = driver
+    with DRIVERS_LOCK:
+        DRIVERS[threading.get_ident()] = driver
+
+
+def scrape_fallback(url):
+    """Scrape one page with this worker's driver. None if shutting down."""
+    if SHUTDOWN_REQUESTED:
+        return None
+    driver = getattr(WORKER_STATE, 'driver', None)
+    if driver is None:
+        driver = create_driver()
+        register_driver(driver)
+    info, driver = scrape_home_away(driver, url)
+    register_driver(driver)  # safe_get may have replaced it
+    return info
+
+
+def quit_drivers():
+    with DRIVERS_LOCK:
+        drivers = list(DRIVERS.values())
+        DRIVERS.clear()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+# ============================================
+# HTTP FETCH (primary path)
+# ============================================
+
+def empty_result():
+    return {
+        'page_home_name': None,
+        'page_home_id': None,
+        'page_away_name': None,
+        'page_away_id': None,
+        'list_date_time': None,
+        'error': None,
+    }
+
+
+RESULT_FIELDS = [
+    'match_uid', 'status', 'match_method',
+    'csv_home_name', 'csv_home_id', 'csv_away_name', 'csv_away_id',
+    *empty_result(),
+]
+
+
+def parse_home_away_html(html):
+    """
+    Same fields as scrape_home_away, from a page's static HTML.
+    Returns None if the participant divs aren't there (needs Selenium).
+    """
+    tree = LexborHTMLParser(html)
+    home_div = tree.css_first('div.duelParticipant__home')
+    away_div = tree.css_first('div.duelParticipant__away')
+    if home_div is None or away_div is None:
+        return None
+
+    result = empty_result()
+    for side, div in [('home', home_div), ('away', away_div)]:
+        name_el = div.css_first('a.participant__participantName, div.participant__participantName')
+        if name_el is None:
+            result['error'] = f"{side.title()} extraction failed: no participant name"
+            return result
+        result[f'page_{side}_name'] = name_el.text().strip()
+        link = div.css_first('a.participant__participantLink')
+        if link is not None:  # Some ITF players may not have profile links
+            result[f'page_{side}_id'] = extract_id_from_href(link.attributes.get('href'))
+
+    time_div = tree.css_first('div.duelParticipant__startTime div')
+    if time_div is not None:
+        result['list_date_time'] = time_div.text().strip()
+    return result
+
+
+class HostLimiter:
+    """
+    Paces requests to one host: at most `rps` request starts per second,
+    plus a backoff that grows on 429/5xx/timeouts and decays on success.
+    Same as the scraper's; only the asyncio side is needed here.
+    """
+
+    def __init__(self, rps):
+        self.min_interval = 1.0 / rps
+        self.last = 0.0
+        self.backoff = 0.0
+
+    def reserve(self):
+        """Claim the next request slot; returns how long to sleep until it."""
+        now = time.monotonic()
+        slot = max(now, self.last + self.min_interval + self.backoff)
+        self.last = slot
+        return slot - now
+
+    async def wait_async(self):
+        await asyncio.sleep(self.reserve())
+
+    def penalize(self):
+        self.backoff = min(self.backoff * 2 + 0.5, 30)
+
+    def relax(self):
+        self.backoff = max(0.0, self.backoff * 0.5)
+
+
+LIMITERS = {}
+
+
+def limiter_for(url):
+    """The HostLimiter for url's host."""
+    host = urllib.parse.urlsplit(url).netloc
+    if host not in LIMITERS:
+        LIMITERS[host] = HostLimiter(REQUESTS_PER_SECOND)
+    return LIMITERS[host]
+
+
+async def open_session():
+    connector = aiohttp.TCPConnector(limit=HTTP_CONCURRENCY, limit_per_host=8, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, headers={'User-Agent': USER_AGENT})
+
+
+async def fetch_home_away(session, url):
+    """
+    Fetch + parse one match page. Returns None if Selenium is needed.
+    429/5xx and timeouts back the host off and are retried; other
+    failures (e.g. a 404) go straight to Selenium.
+    """
+    limiter = limiter_for(url)
+    for attempt in range(1, MAX_RETRIES + 1):
+        await limiter.wait_async()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT)) as resp:
+                resp.raise_for_status()
+                html = await resp.text()
+        except UnicodeDecodeError as e:
+            log(f"  Undecodable page, falling back to Selenium: {url} ({e!r})")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            status = getattr(e, 'status', None)
+            throttled = status is None or status == 429 or status >= 500
+            if throttled:
+                limiter.penalize()
+            if not throttled or attempt == MAX_RETRIES:
+                log(f"  HTTP fetch failed, falling back to Selenium: {url} ({e!r})")
+                return None
+            continue
+        limiter.relax()
+        return parse_home_away_html(html)
+
+
+async def fetch_batch(session, urls):
+    """Fetch a batch of match pages concurrently, results in input order."""
+    sem = asyncio.Semaphore(HTTP_CONCURRENCY)
+
+    async def bounded(url):
+        async with sem:
+            return await fetch_home_away(session, url)
+
+    return await asyncio.gather(*(bounded(url) for url in urls))
+
+
+NON_LETTERS = re.compile(r'[^a-z]')
+
+
+def name_key(name):
+    """
+    Lower-cased name once, as (letters only, surname) for matching.
+    Both are "" for a missing name; surname is "" for a blank one.
+    """
+    if not name:
+        return "", ""
+    lowered = name.lower()
+    words = lowered.split()
+    return NON_LETTERS.sub('', lowered), (words[-1] if words else "")
+
+
 def determine_status(csv_home_id, csv_away_id, page_home_id, page_away_id,
                      csv_home_name, csv_away_name, page_home_name, page_away_name):
     """
@@ -219,24 +499,14 @@ def determine_status(csv_home_id, csv_away_id, page_home_id, page_away_id,
             return 'swapped', 'id_match'
     
     # Fall back to name-based comparison
-    def normalize(name):
-        if not name:
-            return ""
-        return re.sub(r'[^a-z]', '', name.lower().strip())
-    
-    csv_h = normalize(csv_home_name)
-    csv_a = normalize(csv_away_name)
-    page_h = normalize(page_home_name)
-    page_a = normalize(page_away_name)
+    csv_h, csv_h_surname = name_key(csv_home_name)
+    csv_a, csv_a_surname = name_key(csv_away_name)
+    page_h, page_h_surname = name_key(page_home_name)
+    page_a, page_a_surname = name_key(page_away_name)
     
     if csv_h and page_h:
         # Check if names match (allowing for truncation, init differences)
         # Use surname as primary match signal
-        csv_h_surname = csv_home_name.split()[-1].lower() if csv_home_name else ""
-        csv_a_surname = csv_away_name.split()[-1].lower() if csv_away_name else ""
-        page_h_surname = page_home_name.split()[-1].lower() if page_home_name else ""
-        page_a_surname = page_away_name.split()[-1].lower() if page_away_name else ""
-        
         if csv_h_surname == page_h_surname and csv_a_surname == page_a_surname:
             return 'correct', 'name_match'
         if csv_h_surname == page_a_surname and csv_a_surname == page_h_surname:
@@ -252,6 +522,7 @@ def determine_status(csv_home_id, csv_away_id, page_home_id, page_away_id,
 def combine_shards(output_base):
     """Combine all shard outputs into a single file."""
     import glob
+    import pandas as pd  # Only --combine needs pandas; shard runs start without it
     pattern = f"{output_base}_shard*of*.csv"
     shard_files = sorted(glob.glob(pattern))
     
@@ -262,7 +533,7 @@ def combine_shards(output_base):
     log(f"Found {len(shard_files)} shard files:")
     dfs = []
     for f in shard_files:
-        df = pd.read_csv(f)
+        df = pd.read_csv(f, dtype=str)  # IDs and uids stay text (no "123.0")
         log(f"  {f}: {len(df)} rows")
         dfs.append(df)
     
@@ -294,6 +565,25 @@ def combine_shards(output_base):
 # MAIN
 # ============================================
 
+def shard_of(match_uid, total_shards):
+    """Stable shard for a match: crc32 of its uid (hash() is salted per process)."""
+    return zlib.crc32(match_uid.encode('utf-8')) % total_shards
+
+
+def iter_shard_matches(reader, required, shard, total_shards, skip_uids):
+    """
+    This shard's rows still to audit (uid not in skip_uids), as tuples of
+    the required columns in order (missing values read as ""). A match
+    always lands in the same shard, whatever the input order, so each shard
+    file is a stable partition.
+    """
+    pick = operator.itemgetter(*required)
+    for row in reader:
+        uid = row['match_uid']
+        if uid not in skip_uids and shard_of(uid, total_shards) == shard:
+            yield pick(row)
+
+
 def main():
     parser = argparse.ArgumentParser(description="ITF Home/Away Auditor")
     parser.add_argument("--input", default=INPUT_FILE)
@@ -301,10 +591,16 @@ def main():
     parser.add_argument("--shard", type=int, default=0, help="Shard index (0-based)")
     parser.add_argument("--total-shards", type=int, default=1, help="Total shards")
     parser.add_argument("--resume", action="store_true", help="Skip already-audited matches")
-    parser.add_argument("--limit", type=int, default=0, help="Max matches (0=unlimited)")
+    parser.add_argument("--limit", type=int, default=0, help="Max matches to audit this run (0=unlimited)")
+    parser.add_argument("--workers", type=int, default=SELENIUM_WORKERS,
+                        help="Parallel browsers for the Selenium fallback")
     parser.add_argument("--combine", action="store_true", help="Combine shard outputs")
     args = parser.parse_args()
 
+    signal.signal(signal.SIGINT, signal_handler)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, signal_handler)
+
     if args.combine:
         combine_shards(args.output_base)
         return
@@ -323,38 +619,63 @@ def main():
         log(f"ERROR: Input file not found: {args.input}")
         sys.exit(1)
 
-    df = pd.read_csv(args.input, low_memory=False)
+    # The input is streamed: rows are read batch by batch as the audit runs,
+    # so memory doesn't grow with the input size
+    # Rows come out of iter_shard_matches as tuples in this order
     required = ['match_uid', 'match_url', 'player_home', 'player_away', 'player_home_id', 'player_away_id']
-    missing = [c for c in required if c not in df.columns]
+    in_fh = open(args.input, newline='', encoding='utf-8')
+    reader = csv.DictReader(in_fh)
+    missing = [c for c in required if c not in (reader.fieldnames or [])]
     if missing:
         log(f"ERROR: Missing required columns: {missing}")
+        in_fh.close()
         sys.exit(1)
 
-    log(f"Loaded {len(df):,} matches")
-
-    # Shard
-    df = df.iloc[args.shard::args.total_shards].copy().reset_index(drop=True)
-    log(f"This shard: {len(df):,} matches")
-
     # Resume
     existing_uids = set()
     if args.resume and os.path.exists(output_file):
+        # Stream just the match_uid column; the rest of each row isn't needed
         try:
-            existing = pd.read_csv(output_file)
-            existing_uids = set(existing['match_uid'].dropna().astype(str))
+            with open(output_file, newline='', encoding='utf-8') as f:
+                done = csv.reader(f)
+                uid_col = next(done).index('match_uid')
+                existing_uids = frozenset(r[uid_col] for r in done if len(r) > uid_col and r[uid_col])
             log(f"Resuming: {len(existing_uids):,} already audited, skipping")
-        except:
+        except (OSError, StopIteration, ValueError, csv.Error):
             pass
 
-    # Limit
+    # Shard + resume filter in one pass as rows are read; the loop only sees work
+    pending = iter_shard_matches(reader, required, args.shard, args.total_shards, existing_uids)
+    log(f"Streaming this shard's matches from {args.input}")
+
+    # Limit (counts matches audited this run, not ones already done)
     if args.limit > 0:
-        df = df.head(args.limit)
+        pending = itertools.islice(pending, args.limit)
         log(f"Limited to {args.limit} matches")
 
-    # Create driver
-    driver = create_driver()
-
-    results = []
+    # Count the same stream once, up front, for the progress display; only
+    # the match_uid column is picked, so memory stays flat
+    with open(args.input, newline='', encoding='utf-8') as f:
+        counted = iter_shard_matches(csv.DictReader(f), ['match_uid'],
+                                     args.shard, args.total_shards, existing_uids)
+        if args.limit > 0:
+            counted = itertools.islice(counted, args.limit)
+        total_to_process = sum(1 for _ in counted)
+    log(f"Matches to process: {total_to_process:,}")
+
+    # Shard output stays open for the whole run
+    write_header = not os.path.exists(output_file) or os.path.getsize(output_file) == 0
+    out_fh = open(output_file, 'a', newline='', buffering=1 << 16)
+    if write_header:
+        out_fh.write(csv_line(RESULT_FIELDS))
+
+    # HTTP session for the whole shard; browsers are only created if a
+    # page needs the Selenium fallback
+    loop = asyncio.new_event_loop()
+    session = loop.run_until_complete(open_session())
+    pool = ThreadPoolExecutor(max_workers=max(1, args.workers))
+
+    results = deque()  # Pending CSV lines, drained by save_results
     processed = 0
     correct = 0
     swapped = 0
@@ -362,89 +683,84 @@ def main():
     errors = 0
 
     try:
-        for idx, row in df.iterrows():
+        while True:
             if SHUTDOWN_REQUESTED:
                 log("Shutdown requested. Stopping...")
                 break
 
-            match_uid = str(row['match_uid'])
-            if match_uid in existing_uids:
-                continue
-
-            url = row['match_url']
-            csv_home_name = str(row['player_home'])
-            csv_away_name = str(row['player_away'])
-            csv_home_id = str(row['player_home_id'])
-            csv_away_id = str(row['player_away_id'])
-
-            processed += 1
-            remaining = len(df) - len(existing_uids) - processed
-            
-            # Scrape
-            info, driver = scrape_home_away(driver, url)
-
-            if info['error']:
-                errors += 1
-                status = 'error'
-                match_method = None
-                log(f"  [{processed}] {match_uid} ERROR: {info['error']}")
-            else:
-                status, match_method = determine_status(
-                    csv_home_id, csv_away_id, info['page_home_id'], info['page_away_id'],
-                    csv_home_name, csv_away_name, info['page_home_name'], info['page_away_name']
-                )
-                if status == 'correct':
-                    correct += 1
-                elif status == 'swapped':
-                    swapped += 1
+            batch = list(itertools.islice(pending, SAVE_EVERY))
+            if not batch:
+                break
+            urls = [url for _, url, *_ in batch]
+            infos = loop.run_until_complete(fetch_batch(session, urls))
+
+            # Static HTML didn't have the players — scrape those with Selenium
+            fallback = [i for i, info in enumerate(infos) if info is None]
+            for i, info in zip(fallback, pool.map(scrape_fallback, [urls[i] for i in fallback])):
+                infos[i] = info
+
+            for row, info in zip(batch, infos):
+                if info is None:
+                    break  # Shutdown before its fallback page was scraped
+
+                match_uid, _, csv_home_name, csv_away_name, csv_home_id, csv_away_id = row
+
+                processed += 1
+
+                if info['error']:
+                    errors += 1
+                    status = 'error'
+                    match_method = None
+                    log(f"  [{processed}] {match_uid} ERROR: {info['error']}")
                 else:
-                    unknown += 1
-                
-                if status != 'correct':
-                    log(f"  [{processed}] {match_uid} {status.upper()} ({match_method}) | "
-                        f"CSV: {csv_home_name} vs {csv_away_name} | "
-                        f"Page: {info['page_home_name']} vs {info['page_away_name']}")
-
-            results.append({
-                'match_uid': match_uid,
-                'status': status,
-                'match_method': match_method,
-                'csv_home_name': csv_home_name,
-                'csv_home_id': csv_home_id,
-                'csv_away_name': csv_away_name,
-                'csv_away_id': csv_away_id,
-                'page_home_name': info['page_home_name'],
-                'page_home_id': info['page_home_id'],
-                'page_away_name': info['page_away_name'],
-                'page_away_id': info['page_away_id'],
-                'list_date_time': info['list_date_time'],
-                'error': info['error'],
-            })
-
-            # Periodic save
-            if len(results) >= SAVE_EVERY:
-                save_results(output_file, results)
-                log(f"  Saved {len(results)} results | C:{correct} S:{swapped} U:{unknown} E:{errors} | ~{remaining} left")
-                results = []
-
-            # Progress log
-            if processed % 100 == 0:
-                log(f"  Progress: {processed:,} done | C:{correct} S:{swapped} U:{unknown} E:{errors}")
-
-            time.sleep(random.uniform(*DELAY_BETWEEN_MATCHES))
-
-    except KeyboardInterrupt:
-        log("Interrupted — saving progress...")
+                    status, match_method = determine_status(
+                        csv_home_id, csv_away_id, info['page_home_id'], info['page_away_id'],
+                        csv_home_name, csv_away_name, info['page_home_name'], info['page_away_name']
+                    )
+                    if status == 'correct':
+                        correct += 1
+                    elif status == 'swapped':
+                        swapped += 1
+                    else:
+                        unknown += 1
+
+                    if status != 'correct':
+                        log(f"  [{processed}] {match_uid} {status.upper()} ({match_method}) | "
+                            f"CSV: {csv_home_name} vs {csv_away_name} | "
+                            f"Page: {info['page_home_name']} vs {info['page_away_name']}")
+
+                results.append(csv_line((  # RESULT_FIELDS order
+                    match_uid, status, match_method,
+                    csv_home_name, csv_home_id, csv_away_name, csv_away_id,
+                    info['page_home_name'], info['page_home_id'],
+                    info['page_away_name'], info['page_away_id'],
+                    info['list_date_time'], info['error'],
+                )))
+
+                # Periodic save
+                if len(results) >= SAVE_EVERY:
+                    saved = save_results(out_fh, results)
+                    remaining = total_to_process - processed
+                    pct = (processed / total_to_process * 100) if total_to_process > 0 else 0
+                    log(f"  Saved {saved} results | C:{correct} S:{swapped} U:{unknown} E:{errors} | "
+                        f"~{remaining:,} left ({pct:.1f}%)")
+
+                # Progress log
+                if processed % 100 == 0:
+                    log(f"  Progress: {processed:,} done | C:{correct} S:{swapped} U:{unknown} E:{errors}")
 
     finally:
         if results:
-            save_results(output_file, results)
-            log(f"Saved final {len(results)} results")
+            saved = save_results(out_fh, results)
+            log(f"Saved final {saved} results")
+        out_fh.close()
 
-        try:
-            driver.quit()
-        except:
-            pass
+        in_fh.close()
+        loop.run_until_complete(session.close())
+        loop.close()
+
+        pool.shutdown(wait=True, cancel_futures=True)
+        quit_drivers()
 
         log(f"\n{'='*60}")
         log(f"  SUMMARY — Shard {args.shard}/{args.total_shards}")
@@ -457,13 +773,34 @@ def main():
         log(f"  Output:    {output_file}")
 
 
-def save_results(output_file, results):
-    """Append results to CSV."""
-    df_new = pd.DataFrame(results)
-    if os.path.exists(output_file):
-        df_new.to_csv(output_file, mode='a', index=False, header=False)
-    else:
-        df_new.to_csv(output_file, index=False)
+def csv_field(value):
+    """One CSV field, quoted as csv.writer would (QUOTE_MINIMAL); None → empty."""
+    if value is None:
+        return ''
+    value = str(value)
+    if ',' in value or '"' in value or '\n' in value or '\r' in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def csv_line(values):
+    return ','.join(map(csv_field, values)) + '\n'
+
+
+def save_results(out_fh, results):
+    """
+    Append the pending result lines to the open shard CSV and flush them to
+    disk. Returns the number saved. The buffer is emptied even when the
+    write fails: its lines may already be (partly) in the file, so saving
+    them again would duplicate rows.
+    """
+    saved = len(results)
+    try:
+        out_fh.writelines(results)
+        out_fh.flush()
+    finally:
+        results.clear()
+    return saved
 
 
 if __name__ == "__main__":
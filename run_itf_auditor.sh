@@ -39,7 +39,7 @@ python itf_home_away_auditor.py --shard 3 --total-shards 4 --resume
 # =============================================================
 # Dependencies (install if needed):
 #
-#    pip install pandas selenium webdriver-manager
+#    pip install pandas aiohttp selectolax selenium webdriver-manager
 #
 # =============================================================
 # Output files:
@@ -16,7 +16,8 @@
 #
 # 2. Install deps (if needed):
 #
-#    pip install pandas selenium webdriver-manager
+#    pip install pandas pyarrow aiohttp selectolax selenium webdriver-manager
+#    pip install duckdb   # optional, speeds up --combine
 #
 # =============================================================
 # 3. Run all 4 shards (one per terminal/tmux pane):